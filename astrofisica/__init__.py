@@ -0,0 +1,10 @@
+"""
+Estudos de astrofísica computacional e machine learning.
+
+Cada análise é uma função com parâmetros em seu próprio módulo (por exemplo
+`astrofisica.neighborhood.run`); nada é executado na importação e as
+dependências pesadas só são carregadas pelas funções que as usam.
+Linha de comando: `python -m astrofisica <comando>`.
+"""
+
+__version__ = '1.0'
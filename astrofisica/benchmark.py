@@ -0,0 +1,315 @@
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+# --- Parâmetros ---
+# Escalas pré-definidas: linhas do CSV, imagens JPEG, partículas do catálogo sintético
+SCALES = {
+    'small': dict(rows=20_000, images=200, particles=200_000),
+    'medium': dict(rows=200_000, images=2_000, particles=2_000_000),
+    'large': dict(rows=2_000_000, images=20_000, particles=20_000_000),
+}
+SCALE = 'small'
+REPEAT = 3 # Execuções cronometradas por benchmark (a mediana é reportada)
+# Processos dos caminhos paralelos (atlas, disparo de raios, catálogo sintético). Com 1 processo
+# os tempos não dependem do número de núcleos da máquina e o tracemalloc enxerga todo o trabalho.
+NUM_WORKERS = 1
+IMAGE_SIZE = 424 # Tamanho das imagens do Galaxy Zoo
+OUTPUT_FILE = 'benchmark_results.json'
+REGRESSION_THRESHOLD = 0.10 # Aumento relativo considerado regressão na comparação
+SEED = 42
+
+GALAXY_ZOO_COLUMNS = [f'Class{q}.{a}' for q, answers in
+                      [(1, 3), (2, 2), (3, 2), (4, 2), (5, 4), (6, 2), (7, 3), (8, 7), (9, 3), (10, 3), (11, 6)]
+                      for a in range(1, answers + 1)]
+
+
+# --- 1. Entradas Sintéticas Compatíveis com os Dados Reais ---
+def make_sdss_csv(path, num_rows, seed=SEED):
+    """
+    CSV com o mesmo formato de sdss_data.csv (linha de título antes do
+    cabeçalho): objid, ra, dec, u, g, r, i, z, class, redshift.
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    classes = rng.choice(['GALAXY', 'STAR', 'QSO'], size=num_rows, p=[0.6, 0.3, 0.1])
+    redshift = np.where(classes == 'STAR', rng.normal(0, 0.0005, num_rows),
+                        np.where(classes == 'QSO', rng.uniform(0.3, 3.0, num_rows), rng.gamma(2.0, 0.05, num_rows)))
+    r = rng.normal(17.5, 1.0, num_rows)
+    # Cores aproximadas por classe, para que o classificador tenha algum sinal
+    g_r = np.where(classes == 'GALAXY', 0.8, np.where(classes == 'STAR', 0.5, 0.2)) + rng.normal(0, 0.2, num_rows)
+    df = pd.DataFrame({
+        'objid': np.arange(1237645876861272000, 1237645876861272000 + num_rows),
+        'ra': rng.uniform(0, 360, num_rows),
+        'dec': np.rad2deg(np.arcsin(rng.uniform(-0.2, 1.0, num_rows))),
+        'u': r + g_r + 1.2 + rng.normal(0, 0.3, num_rows),
+        'g': r + g_r,
+        'r': r,
+        'i': r - 0.4 * g_r + rng.normal(0, 0.1, num_rows),
+        'z': r - 0.6 * g_r + rng.normal(0, 0.1, num_rows),
+        'class': classes,
+        'redshift': redshift,
+    })
+    with open(path, 'w', newline='') as f:
+        f.write('#Table1\n')
+        df.to_csv(f, index=False)
+    return path
+
+
+def make_galaxy_images(image_dir, num_images, size=IMAGE_SIZE, seed=SEED):
+    """Recortes JPEG <GalaxyID>.jpg com uma galáxia elíptica sintética e ruído. Retorna os IDs."""
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    os.makedirs(image_dir, exist_ok=True)
+    ids = 100000 + np.sort(rng.choice(900000, size=num_images, replace=False))
+    Y, X = np.mgrid[:size, :size] - size / 2
+    for galaxy_id in ids:
+        angle = rng.uniform(0, np.pi)
+        axis_ratio = rng.uniform(0.3, 1.0)
+        scale = rng.uniform(10, 40)
+        xr = X * np.cos(angle) + Y * np.sin(angle)
+        yr = (-X * np.sin(angle) + Y * np.cos(angle)) / axis_ratio
+        profile = np.exp(-np.hypot(xr, yr) / scale)
+        color = rng.uniform(0.6, 1.0, 3)
+        img = profile[..., np.newaxis] * color * 255 + rng.normal(0, 6, (size, size, 3))
+        Image.fromarray(np.clip(img, 0, 255).astype(np.uint8)).save(os.path.join(image_dir, f'{galaxy_id}.jpg'),
+                                                                    quality=90)
+    return ids
+
+
+def make_solutions_csv(path, galaxy_ids, seed=SEED):
+    """Tabela no formato training_solutions.csv (GalaxyID + 37 colunas de probabilidade)."""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    data = {'GalaxyID': galaxy_ids}
+    question_sizes = {}
+    for column in GALAXY_ZOO_COLUMNS:
+        question = column.split('.')[0]
+        question_sizes[question] = question_sizes.get(question, 0) + 1
+    for question, num_answers in question_sizes.items():
+        probabilities = rng.dirichlet(np.ones(num_answers), size=len(galaxy_ids))
+        for a in range(num_answers):
+            data[f'{question}.{a + 1}'] = probabilities[:, a]
+    pd.DataFrame(data).to_csv(path, index=False)
+    return path
+
+
+def make_inputs(workdir, rows, images, seed=SEED):
+    """Gera sdss_data.csv, images/ e training_solutions.csv em `workdir`."""
+    csv_path = make_sdss_csv(os.path.join(workdir, 'sdss_data.csv'), rows, seed)
+    image_dir = os.path.join(workdir, 'images')
+    ids = make_galaxy_images(image_dir, images, seed=seed)
+    solutions_path = make_solutions_csv(os.path.join(workdir, 'training_solutions.csv'), ids, seed)
+    return csv_path, image_dir, solutions_path
+
+
+# --- 2. Medição (Tempo de Parede e Pico de Memória) ---
+def measure(name, func, repeat=REPEAT, setup=None, **info):
+    """
+    Executa `func(*setup())` `repeat` vezes medindo o tempo de parede, e
+    uma vez extra sob tracemalloc para o pico de memória alocada (o
+    rastreamento deixa a execução mais lenta, por isso fica fora da
+    cronometragem). A saída impressa pela função é descartada.
+    O tracemalloc só enxerga o processo atual: quando `workers` > 1, também
+    é registrado o pico de RSS dos processos filhos (getrusage), que é o
+    máximo entre todos os filhos já encerrados, não apenas os desta medição.
+    """
+    from .instrumentation import peak_rss_mb
+
+    times = []
+    for _ in range(repeat):
+        args = setup() if setup is not None else ()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func(*args)
+            times.append(time.perf_counter() - start)
+
+    args = setup() if setup is not None else ()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = dict(name=name, wall_time_s=statistics.median(times), wall_times_s=times,
+                  peak_memory_mb=peak / 2**20, **info)
+    if info.get('workers', 1) > 1:
+        result['children_peak_rss_mb'] = peak_rss_mb('children')
+    print(f"{name:<28} {result['wall_time_s']:>10.4f} s {result['peak_memory_mb']:>10.1f} MB"
+          + (f" (filhos: {result['children_peak_rss_mb']:.1f} MB RSS)"
+             if result.get('children_peak_rss_mb') is not None else ''))
+    return result
+
+
+def check_ray_shooting_region(kappa_star=0.4, source_half_size=5.0, seed=SEED, tolerance=0.05):
+    """
+    Verificação de regressão: a região de raios estimada por
+    magnification_map a partir das lentes (padrão) deve coincidir com a
+    região explícita calculada com o kappa* usado para gerar as lentes.
+    """
+    from . import ray_shooting
+
+    explicit = ray_shooting.shooting_region(source_half_size, kappa_star)
+    positions, masses = ray_shooting.random_point_lenses(kappa_star, 1.5 * explicit, seed=seed)
+    default = ray_shooting.shooting_region(source_half_size, ray_shooting.estimate_kappa_star(positions, masses))
+    if abs(default - explicit) > tolerance * explicit:
+        raise ValueError(f"Região de raios padrão ({default:.2f}) difere da explícita ({explicit:.2f}).")
+    return default, explicit
+
+
+# --- 3. Caminhos Críticos ---
+def run_benchmarks(workdir, rows, images, particles, repeat=REPEAT, seed=SEED, num_workers=NUM_WORKERS):
+    from . import catalog, classifier_numerical, explorer, lens_batch, mock_catalog, neighborhood, ray_shooting
+    from . import thumbnail_atlas
+
+    print("Gerando entradas sintéticas...")
+    csv_path, image_dir, solutions_path = make_inputs(workdir, rows, images, seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = catalog.load_sdss_catalog(csv_path)
+        catalog.add_cartesian_coords(df)
+        coords = catalog.cartesian_coords(df)
+        X, y = classifier_numerical.load_features(csv_path)
+    image_paths = sorted(os.path.join(image_dir, name) for name in os.listdir(image_dir))
+
+    results = []
+    add = results.append
+    print(f"{'benchmark':<28} {'tempo':>12} {'pico mem.':>13}")
+
+    add(measure('csv_load', catalog.load_sdss_catalog, repeat, setup=lambda: (csv_path,), rows=rows))
+    add(measure('coordinate_transform', catalog.add_cartesian_coords, repeat,
+                setup=lambda: (df[['ra', 'dec', 'redshift']].copy(),), rows=len(df)))
+    add(measure('neighbor_count', neighborhood.count_neighbors, repeat,
+                setup=lambda: (coords, neighborhood.SEARCH_RADIUS_MPC), rows=len(coords)))
+    add(measure('kmeans', explorer.cluster_galaxies, 1,
+                setup=lambda: (df[['x', 'y', 'z_cartesian']].copy(),), rows=len(df)))
+
+    def knn_fit_predict(X, y):
+        model, _, _, X_test_scaled, _ = classifier_numerical.train_knn(X, y)
+        model.predict(X_test_scaled)
+    add(measure('knn_fit_predict', knn_fit_predict, 1, setup=lambda: (X, y), rows=len(X)))
+
+    def decode_images(paths):
+        for path in paths:
+            thumbnail_atlas.load_thumbnail(path)
+    add(measure('image_decode', decode_images, repeat, setup=lambda: (image_paths,), images=len(image_paths)))
+    atlas_path = os.path.join(workdir, 'atlas.npy')
+    index_path = os.path.join(workdir, 'atlas_index.npz')
+    add(measure('atlas_build', thumbnail_atlas.build_atlas, 1,
+                setup=lambda: (image_dir, atlas_path, index_path, thumbnail_atlas.THUMB_SIZE,
+                               thumbnail_atlas.CHUNK_SIZE, num_workers),
+                images=len(image_paths), workers=num_workers))
+
+    stack = lens_batch.load_image_stack(image_paths[:64], lens_batch.IMAGE_SIZE)
+    add(measure('lens_field', lens_batch.compute_source_coords, repeat,
+                setup=lambda: (lens_batch.IMAGE_SIZE, lens_batch.LENS_STRENGTH), images=1))
+    field = lens_batch.DeflectionFieldCache(cache_dir=None).get(lens_batch.IMAGE_SIZE, lens_batch.LENS_STRENGTH)
+    add(measure('lens_apply_stack', field.apply, repeat, setup=lambda: (stack,), images=len(stack)))
+
+    check_ray_shooting_region(seed=seed)
+    lens_positions, lens_masses = ray_shooting.random_point_lenses(0.4, 30.0, seed=seed)
+    add(measure('ray_shooting', functools.partial(ray_shooting.magnification_map, num_workers=num_workers), 1,
+                setup=lambda: (lens_positions, lens_masses, 5.0, 200, 2000, 15.0),
+                rays=2000**2, lenses=len(lens_positions), workers=num_workers))
+
+    add(measure('mock_structure', mock_catalog.generate_mock_cosmic_structure, repeat,
+                setup=lambda: (particles // 10, 8, 7, seed), rows=particles // 10))
+    mock_path = os.path.join(workdir, 'mock.npy')
+    stream_mock_catalog = functools.partial(mock_catalog.stream_mock_catalog, num_workers=num_workers)
+    add(measure('mock_lognormal_stream', stream_mock_catalog, 1,
+                setup=lambda: (mock_path, particles, 'lognormal'), rows=particles, workers=num_workers))
+    return results
+
+
+def environment_info():
+    import scipy
+    import sklearn
+    import pandas as pd
+
+    return dict(python=platform.python_version(), platform=platform.platform(), cpu_count=os.cpu_count(),
+                numpy=np.__version__, scipy=scipy.__version__, pandas=pd.__version__, sklearn=sklearn.__version__)
+
+
+# --- 4. Comparação entre Execuções ---
+def compare(baseline_path, current_path, threshold=REGRESSION_THRESHOLD):
+    """
+    Compara dois arquivos de resultados e retorna a lista de regressões
+    (benchmarks cujo tempo ou pico de memória cresceu mais que `threshold`).
+    """
+    with open(baseline_path) as f:
+        baseline_report = json.load(f)
+    with open(current_path) as f:
+        current_report = json.load(f)
+    baseline = {r['name']: r for r in baseline_report['results']}
+    current = {r['name']: r for r in current_report['results']}
+    if baseline_report.get('num_workers', 1) != current_report.get('num_workers', 1):
+        print(f"Aviso: execuções com números de processos diferentes ({baseline_report.get('num_workers', 1)} e "
+              f"{current_report.get('num_workers', 1)}); os caminhos paralelos não são comparáveis.")
+
+    regressions = []
+    print(f"{'benchmark':<28} {'tempo':>10} {'memória':>10}")
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        time_ratio = result['wall_time_s'] / base['wall_time_s'] if base['wall_time_s'] > 0 else 1.0
+        memory_ratio = result['peak_memory_mb'] / base['peak_memory_mb'] if base['peak_memory_mb'] > 0 else 1.0
+        if result.get('children_peak_rss_mb') and base.get('children_peak_rss_mb'):
+            memory_ratio = max(memory_ratio, result['children_peak_rss_mb'] / base['children_peak_rss_mb'])
+        flag = ''
+        if time_ratio > 1 + threshold or memory_ratio > 1 + threshold:
+            regressions.append(dict(name=name, time_ratio=time_ratio, memory_ratio=memory_ratio))
+            flag = '  <- regressão'
+        print(f"{name:<28} {time_ratio:>9.2f}x {memory_ratio:>9.2f}x{flag}")
+    return regressions
+
+
+def run(scale=SCALE, rows=None, images=None, particles=None, repeat=REPEAT, output_path=OUTPUT_FILE,
+        baseline_path=None, workdir=None, keep=False, seed=SEED, num_workers=NUM_WORKERS):
+    """
+    Gera entradas sintéticas na escala escolhida, mede os caminhos críticos
+    e grava os resultados em JSON. Com `baseline_path`, compara com uma
+    execução anterior e levanta ValueError se houver regressões.
+    """
+    if scale not in SCALES:
+        raise ValueError(f"Escala desconhecida: {scale!r} (use {', '.join(SCALES)}).")
+    sizes = dict(SCALES[scale])
+    for key, value in (('rows', rows), ('images', images), ('particles', particles)):
+        if value is not None:
+            sizes[key] = value
+
+    created = workdir is None
+    workdir = tempfile.mkdtemp(prefix='astrofisica_bench_') if created else workdir
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        results = run_benchmarks(workdir, sizes['rows'], sizes['images'], sizes['particles'], repeat, seed,
+                                 num_workers)
+    finally:
+        if created and not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = dict(created=time.strftime('%Y-%m-%dT%H:%M:%S'), scale=scale, sizes=sizes, repeat=repeat, seed=seed,
+                  num_workers=num_workers, environment=environment_info(), results=results)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados gravados em '{output_path}'.")
+
+    if baseline_path is not None:
+        regressions = compare(baseline_path, output_path)
+        if regressions:
+            raise ValueError(f"{len(regressions)} regressão(ões) em relação a '{baseline_path}'.")
+    return report
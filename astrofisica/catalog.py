@@ -0,0 +1,100 @@
+import numpy as np
+
+from .instrumentation import stage
+
+# --- Parâmetros ---
+CSV_FILE = 'sdss_data.csv'
+H0 = 70.0 # Constante de Hubble (aproximado) em km/s/Mpc
+C_KMS = 299792.458 # Velocidade da luz em km/s
+
+MAGNITUDE_COLS = ['u', 'g', 'r', 'i', 'z']
+
+
+# --- 1. Carregamento do Catálogo SDSS ---
+def read_sdss_csv(csv_path=CSV_FILE):
+    """
+    Lê o CSV do SDSS (cabeçalho na segunda linha, colunas separadas por
+    vírgulas) e normaliza os nomes das colunas para minúsculas.
+    """
+    import pandas as pd
+
+    try:
+        df = pd.read_csv(csv_path, skiprows=1, low_memory=False)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"{csv_path} não encontrado. Certifique-se de que o arquivo está na mesma pasta.")
+    df.columns = df.columns.str.lower()
+    return df
+
+
+def require_columns(df, required_cols):
+    """Levanta ValueError se alguma coluna necessária estiver ausente."""
+    if not all(col in df.columns for col in required_cols):
+        raise ValueError(f"Colunas esperadas {required_cols} não encontradas no CSV. "
+                         f"Colunas disponíveis: {df.columns.tolist()}")
+
+
+def load_sdss_catalog(csv_path=CSV_FILE, required_cols=('ra', 'dec', 'redshift'), dropna_cols=('redshift',),
+                      sky_order=None):
+    """
+    Carrega o catálogo, verifica as colunas necessárias, remove linhas com
+    NaN em `dropna_cols` e mantém apenas redshifts positivos. Com
+    `sky_order`, adiciona a coluna 'sky_pix' e ordena o catálogo pelo pixel
+    do céu (ver skypix.SkyIndex).
+    """
+    with stage('load') as record:
+        df = read_sdss_csv(csv_path)
+        record['rows'] = len(df)
+    require_columns(df, list(required_cols))
+    df = clean_catalog(df, dropna_cols)
+    if sky_order is not None:
+        from .skypix import add_sky_pixels
+
+        df = add_sky_pixels(df, sky_order)
+    print(f"Dados carregados: {len(df)} linhas")
+    return df
+
+
+def clean_catalog(df, dropna_cols=('redshift',)):
+    """Remove linhas com NaN em `dropna_cols` e mantém apenas redshifts positivos."""
+    with stage('clean') as record:
+        df = df.dropna(subset=list(dropna_cols))
+        df = df[df['redshift'] > 0] # Redshifts devem ser positivos
+        df = df.reset_index(drop=True)
+        record['rows'] = len(df)
+    return df
+
+
+# --- 2. Colunas Derivadas ---
+def add_cartesian_coords(df, h0=H0):
+    """Converte (RA, Dec, redshift) em distância (Mpc) e coordenadas cartesianas X, Y, Z."""
+    with stage('transform', rows=len(df)):
+        df['distance_mpc'] = df['redshift'] * C_KMS / h0
+
+        ra_rad = np.deg2rad(df['ra'])
+        dec_rad = np.deg2rad(df['dec'])
+
+        df['x'] = df['distance_mpc'] * np.cos(dec_rad) * np.cos(ra_rad)
+        df['y'] = df['distance_mpc'] * np.cos(dec_rad) * np.sin(ra_rad)
+        df['z_cartesian'] = df['distance_mpc'] * np.sin(dec_rad)
+    return df
+
+
+def cartesian_coords(df):
+    """Array (N, 3) com as coordenadas cartesianas já calculadas."""
+    return df[['x', 'y', 'z_cartesian']].to_numpy()
+
+
+def add_colors(df):
+    """Cores (diferenças de magnitudes) usadas pelas análises."""
+    df['g_r_color'] = df['g'] - df['r']
+    if 'u' in df.columns:
+        df['u_g_color'] = df['u'] - df['g']
+    if 'i' in df.columns:
+        df['r_i_color'] = df['r'] - df['i']
+    return df
+
+
+def add_absolute_magnitude(df):
+    """Magnitude absoluta M_r a partir da distância (remove linhas sem distância válida)."""
+    df['M_r'] = df['r'] - (5 * np.log10(df['distance_mpc'].replace(0, np.nan)) + 25)
+    return df.dropna(subset=['M_r'])
@@ -0,0 +1,304 @@
+import glob
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+from . import catalog
+from .explorer import N_CLUSTERS, assign_clusters, fit_clusters
+from .instrumentation import stage
+from .neighborhood import SEARCH_RADIUS_MPC, count_neighbors
+
+# --- Parâmetros ---
+STORE_DIR = 'catalog_store' # Pasta do catálogo incremental
+KEY_COL = 'objid' # Coluna que identifica um objeto (modo 'update')
+REBUILD_FRACTION = 0.25 # Reconstrói a árvore principal quando o delta passa dessa fração das linhas
+
+# Cada gravação vai para um arquivo temporário e é renomeada (os.replace); o manifesto é
+# gravado por último e aponta para os arquivos de estado e da árvore da versão atual, de modo
+# que uma ingestão interrompida deixa o catálogo na versão anterior, sempre consistente.
+MANIFEST_FILE = 'manifest.json' # Parâmetros, histórico dos lotes e arquivos da versão atual
+STATE_PATTERN = 'state_{:05d}.npz' # n_neighbors, cluster_id, linhas substituídas e centros do K-Means
+TREE_PATTERN = 'tree_{:05d}.pkl' # KDTree principal (linhas [0, base_size))
+
+
+def derive_columns(df, h0=catalog.H0):
+    """Colunas derivadas de um lote: coordenadas 3D e, se houver as magnitudes, cores e M_r."""
+    catalog.add_cartesian_coords(df, h0)
+    if all(col in df.columns for col in catalog.MAGNITUDE_COLS):
+        catalog.add_colors(df)
+        df = catalog.add_absolute_magnitude(df).reset_index(drop=True)
+    return df
+
+
+# --- 1. Catálogo Incremental ---
+class CatalogStore:
+    """
+    Catálogo SDSS persistido em lotes, com os produtos derivados
+    (coordenadas, cores, n_neighbors e cluster_id) mantidos em dia.
+    Cada lote novo tem suas colunas derivadas calculadas só para as suas
+    linhas; n_neighbors é recontado apenas para as galáxias a até `radius`
+    dos pontos novos (ou substituídos), usando a KDTree principal já
+    construída mais uma KDTree pequena só com as linhas recentes (delta);
+    os pontos novos recebem o aglomerado do centro K-Means mais próximo,
+    sem reajuste. Linhas substituídas no modo 'update' continuam no disco,
+    marcadas em `retired`, e são ignoradas em todas as contagens.
+    """
+
+    def __init__(self, store_dir=STORE_DIR):
+        import pandas as pd
+
+        manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"Catálogo incremental '{store_dir}' não encontrado. "
+                                    f"Crie-o primeiro com CatalogStore.create().")
+        self.store_dir = store_dir
+        with open(manifest_path) as f:
+            self.manifest = json.load(f)
+        self.radius = self.manifest['radius']
+        self.h0 = self.manifest['h0']
+        self.key = self.manifest['key']
+
+        with stage('load') as record:
+            self.df = pd.concat([pd.read_pickle(os.path.join(store_dir, batch['file']))
+                                 for batch in self.manifest['batches']], ignore_index=True)
+            record['rows'] = len(self.df)
+            with np.load(os.path.join(store_dir, self.manifest['state_file'])) as state:
+                self.n_neighbors = state['n_neighbors']
+                self.cluster_id = state['cluster_id']
+                self.retired = state['retired']
+                self.centers = state['centers']
+                self.base_size = int(state['base_size'])
+            with open(os.path.join(store_dir, self.manifest['tree_file']), 'rb') as f:
+                self.tree = pickle.load(f)
+        expected_rows = sum(batch['rows'] for batch in self.manifest['batches'])
+        lengths = {len(self.df), len(self.n_neighbors), len(self.cluster_id), len(self.retired)}
+        if lengths != {expected_rows} or self.tree.n != self.base_size:
+            raise ValueError(f"Catálogo incremental '{store_dir}' inconsistente: {expected_rows} linhas no manifesto, "
+                             f"{len(self.df)} nos lotes e {len(self.n_neighbors)} no estado.")
+        self.coords = catalog.cartesian_coords(self.df)
+        self.delta_tree = self._build_delta_tree()
+
+    @classmethod
+    def create(cls, csv_path=catalog.CSV_FILE, store_dir=STORE_DIR, radius=SEARCH_RADIUS_MPC,
+               n_clusters=N_CLUSTERS, key=KEY_COL, h0=catalog.H0):
+        """Cálculo completo (uma única vez): lote 0, KDTree, n_neighbors e K-Means."""
+        from scipy.spatial import cKDTree
+
+        df = derive_columns(catalog.load_sdss_catalog(csv_path), h0)
+        df['batch'] = 0
+        coords = catalog.cartesian_coords(df)
+        with stage('index_build', rows=len(coords)):
+            tree = cKDTree(coords)
+        n_neighbors = count_neighbors(coords, radius, tree)
+        kmeans = fit_clusters(coords, n_clusters)
+
+        os.makedirs(store_dir, exist_ok=True)
+        manifest = dict(radius=radius, h0=h0, key=key, n_clusters=n_clusters, batches=[])
+        batch_file = _write_batch(store_dir, df, 0)
+        manifest['batches'].append(dict(batch=0, file=batch_file, source=str(csv_path), mode='create',
+                                        rows=len(df), replaced=0, updated_neighbors=len(df),
+                                        time=time.strftime('%Y-%m-%d %H:%M:%S')))
+        manifest['state_file'] = _write_state(store_dir, 0, n_neighbors, kmeans.labels_,
+                                              np.zeros(len(df), dtype=bool), kmeans.cluster_centers_, len(df))
+        manifest['tree_file'] = _write_tree(store_dir, 0, tree)
+        _commit_manifest(store_dir, manifest)
+        print(f"Catálogo incremental criado em '{store_dir}' com {len(df)} linhas.")
+        return cls(store_dir)
+
+    def __len__(self):
+        return int(np.count_nonzero(~self.retired))
+
+    def _build_delta_tree(self):
+        from scipy.spatial import cKDTree
+
+        if self.base_size == len(self.coords):
+            return None
+        with stage('index_build', rows=len(self.coords) - self.base_size):
+            return cKDTree(self.coords[self.base_size:])
+
+    def _trees(self):
+        """(árvore, deslocamento das linhas): a principal e, se houver, a delta."""
+        trees = [(self.tree, 0)]
+        if self.delta_tree is not None:
+            trees.append((self.delta_tree, self.base_size))
+        return trees
+
+    def _neighbors_of(self, points):
+        """Linhas (incluindo substituídas) a até `radius` de algum dos pontos."""
+        found = []
+        for tree, offset in self._trees():
+            for rows in tree.query_ball_point(points, self.radius, workers=-1):
+                found.append(np.asarray(rows, dtype=np.int64) + offset)
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def _count_neighbors(self, rows):
+        """n_neighbors das linhas `rows`, ignorando linhas substituídas (e a própria galáxia)."""
+        points = self.coords[rows]
+        counts = np.zeros(len(rows), dtype=np.int64)
+        for tree, offset in self._trees():
+            if not self.retired.any():
+                counts += np.asarray(tree.query_ball_point(points, self.radius, return_length=True, workers=-1))
+                continue
+            neighbor_lists = tree.query_ball_point(points, self.radius, workers=-1)
+            lengths = np.fromiter(map(len, neighbor_lists), dtype=np.int64, count=len(neighbor_lists))
+            flat = np.fromiter((j for row in neighbor_lists for j in row), dtype=np.int64, count=lengths.sum())
+            owner = np.repeat(np.arange(len(rows)), lengths)
+            counts += np.bincount(owner[~self.retired[flat + offset]], minlength=len(rows))
+        return counts - 1
+
+    def ingest(self, source, mode='append'):
+        """
+        Adiciona um lote (caminho de CSV do SDSS ou DataFrame). No modo
+        'update', objetos cuja chave já existe são substituídos pela nova
+        versão. Recalcula apenas o que o lote afeta e grava o lote como um
+        novo arquivo. Retorna o número do lote.
+        """
+        import pandas as pd
+        from scipy.spatial import cKDTree
+
+        if mode not in ('append', 'update'):
+            raise ValueError(f"Modo desconhecido: {mode!r} (use 'append' ou 'update').")
+        if isinstance(source, pd.DataFrame):
+            new_df = source.copy()
+            new_df.columns = new_df.columns.str.lower()
+            catalog.require_columns(new_df, ['ra', 'dec', 'redshift'])
+            new_df = catalog.clean_catalog(new_df)
+        else:
+            new_df = catalog.load_sdss_catalog(source)
+        new_df = derive_columns(new_df, self.h0)
+        batch = self.manifest['batches'][-1]['batch'] + 1
+        new_df['batch'] = batch
+
+        # Versões antigas dos objetos que o lote substitui
+        replaced_rows = np.empty(0, dtype=np.int64)
+        if mode == 'update':
+            if self.key not in new_df.columns or self.key not in self.df.columns:
+                raise ValueError(f"O modo 'update' precisa da coluna-chave '{self.key}' no catálogo e no lote.")
+            new_df = new_df.drop_duplicates(subset=self.key, keep='last').reset_index(drop=True)
+            active = np.flatnonzero(~self.retired)
+            replaced_rows = active[np.isin(self.df[self.key].to_numpy()[active], new_df[self.key].to_numpy())]
+
+        with stage('transform', rows=len(new_df)):
+            start = len(self.df)
+            new_rows = np.arange(start, start + len(new_df))
+            new_coords = catalog.cartesian_coords(new_df)
+            self.df = pd.concat([self.df, new_df], ignore_index=True)
+            self.coords = np.concatenate([self.coords, new_coords])
+            self.n_neighbors = np.concatenate([self.n_neighbors, np.zeros(len(new_df), dtype=self.n_neighbors.dtype)])
+            self.cluster_id = np.concatenate([self.cluster_id, assign_clusters(new_coords, self.centers)
+                                              .astype(self.cluster_id.dtype)])
+            self.retired = np.concatenate([self.retired, np.zeros(len(new_df), dtype=bool)])
+            self.retired[replaced_rows] = True
+
+        # Árvore principal mantida; o delta (linhas recentes) é pequeno e reconstruído a cada lote
+        rebuilt = len(self.coords) - self.base_size > REBUILD_FRACTION * self.base_size
+        if rebuilt:
+            with stage('index_build', rows=len(self.coords)):
+                self.tree = cKDTree(self.coords)
+            self.base_size = len(self.coords)
+        self.delta_tree = self._build_delta_tree()
+
+        # Só mudam as contagens das galáxias perto dos pontos novos ou das posições substituídas
+        with stage('query', rows=len(new_rows) + len(replaced_rows)) as record:
+            changed_points = np.concatenate([new_coords, self.coords[replaced_rows]])
+            affected = self._neighbors_of(changed_points)
+            affected = affected[~self.retired[affected]]
+            self.n_neighbors[affected] = self._count_neighbors(affected)
+            record['affected'] = len(affected)
+
+        with stage('export', rows=len(new_df)):
+            # Lote, estado e árvore em arquivos novos; só o manifesto (por último) os torna a versão atual
+            manifest = dict(self.manifest, batches=list(self.manifest['batches']))
+            batch_file = _write_batch(self.store_dir, new_df, batch)
+            manifest['state_file'] = _write_state(self.store_dir, batch, self.n_neighbors, self.cluster_id,
+                                                  self.retired, self.centers, self.base_size)
+            if rebuilt:
+                manifest['tree_file'] = _write_tree(self.store_dir, batch, self.tree)
+            manifest['batches'].append(dict(batch=batch, file=batch_file,
+                                                 source=source if isinstance(source, str) else 'DataFrame',
+                                                 mode=mode, rows=len(new_df), replaced=len(replaced_rows),
+                                                 updated_neighbors=len(affected),
+                                                 time=time.strftime('%Y-%m-%d %H:%M:%S')))
+            _commit_manifest(self.store_dir, manifest)
+            self.manifest = manifest
+
+        print(f"Lote {batch}: {len(new_df)} linhas novas, {len(replaced_rows)} substituídas, "
+              f"n_neighbors recontado para {len(affected)} galáxias"
+              f"{' (KDTree principal reconstruída)' if rebuilt else ''}.")
+        return batch
+
+    def new_rows(self, batch=None):
+        """Posições das linhas gravadas pelo lote `batch` (padrão: o último)."""
+        if batch is None:
+            batch = self.manifest['batches'][-1]['batch']
+        return np.flatnonzero(self.df['batch'].to_numpy() == batch)
+
+    def catalog(self, include_retired=False):
+        """Catálogo com n_neighbors e cluster_id (por padrão, só as versões atuais dos objetos)."""
+        df = self.df.assign(n_neighbors=self.n_neighbors, cluster_id=self.cluster_id)
+        return df if include_retired else df[~self.retired].reset_index(drop=True)
+
+
+def _atomic_write(path, write, mode='wb'):
+    """Grava via `write(arquivo)` em um temporário e o renomeia para `path` (nunca deixa arquivo parcial)."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_batch(store_dir, df, batch):
+    batch_file = f"batch_{batch:05d}.pkl"
+    _atomic_write(os.path.join(store_dir, batch_file), lambda f: df.to_pickle(f, compression=None))
+    return batch_file
+
+
+def _write_state(store_dir, version, n_neighbors, cluster_id, retired, centers, base_size):
+    state_file = STATE_PATTERN.format(version)
+    _atomic_write(os.path.join(store_dir, state_file),
+                  lambda f: np.savez(f, n_neighbors=n_neighbors, cluster_id=cluster_id, retired=retired,
+                                     centers=centers, base_size=np.int64(base_size)))
+    return state_file
+
+
+def _write_tree(store_dir, version, tree):
+    tree_file = TREE_PATTERN.format(version)
+    _atomic_write(os.path.join(store_dir, tree_file),
+                  lambda f: pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL))
+    return tree_file
+
+
+def _commit_manifest(store_dir, manifest):
+    """Torna a nova versão a atual e remove estados e árvores que o manifesto não usa mais."""
+    _atomic_write(os.path.join(store_dir, MANIFEST_FILE), lambda f: json.dump(manifest, f, indent=2), mode='w')
+    for pattern, current in (('state_*.npz', manifest['state_file']), ('tree_*.pkl', manifest['tree_file'])):
+        for path in glob.glob(os.path.join(store_dir, pattern)):
+            if os.path.basename(path) != current:
+                os.remove(path)
+
+
+def run(csv_path=catalog.CSV_FILE, store_dir=STORE_DIR, mode='append', radius=SEARCH_RADIUS_MPC,
+        n_clusters=N_CLUSTERS):
+    """
+    Cria o catálogo incremental a partir de `csv_path` (se `store_dir` ainda
+    não existir) ou ingere `csv_path` como um novo lote.
+    """
+    if not os.path.exists(os.path.join(store_dir, MANIFEST_FILE)):
+        store = CatalogStore.create(csv_path, store_dir, radius, n_clusters)
+    else:
+        store = CatalogStore(store_dir)
+        store.ingest(csv_path, mode)
+    print(f"Catálogo incremental '{store_dir}': {len(store)} objetos em {len(store.manifest['batches'])} lotes.")
+    return store
@@ -0,0 +1,169 @@
+import os
+
+import numpy as np
+
+from .instrumentation import instrumented, stage
+from .thumbnail_atlas import CLASS_NAMES, simplified_labels
+
+# --- Parâmetros ---
+DATA_DIR = '.' # Onde training_solutions.csv está
+IMAGE_DIR = os.path.join(DATA_DIR, 'images') # Pasta onde as imagens foram descompactadas
+IMAGE_SIZE = 64 # Redimensionar todas as imagens para 64x64 pixels (um tamanho menor acelera o treinamento)
+NUM_CLASSES = 3 # 0=Elíptica, 1=Espirais, 2=Irregulares (Simplificação)
+EPOCHS = 5 # Número de épocas de treinamento (pode aumentar para melhor resultado)
+BATCH_SIZE = 32
+NUM_IMAGES_TO_PROCESS = 10000 # Ajuste conforme sua RAM e tempo disponível
+
+
+# --- 1. Rótulos e Imagens ---
+def load_labels(solutions_path=os.path.join(DATA_DIR, 'training_solutions.csv')):
+    """
+    Rótulos simplificados (3 classes principais) por GalaxyID. Galáxias que
+    não se encaixam claramente em nenhuma das 3 classes são descartadas.
+    """
+    import pandas as pd
+
+    with stage('load') as record:
+        solutions_df = pd.read_csv(solutions_path)
+        record['rows'] = len(solutions_df)
+    print(f"Dados de soluções carregados: {len(solutions_df)} linhas")
+    with stage('clean') as record:
+        solutions_df['simplified_label'] = simplified_labels(solutions_df)
+        solutions_df = solutions_df[solutions_df['simplified_label'] != -1]
+        record['rows'] = len(solutions_df)
+    return solutions_df['GalaxyID'].to_numpy(), solutions_df['simplified_label'].to_numpy()
+
+
+@instrumented('load')
+def load_images(galaxy_ids, labels, image_dir=IMAGE_DIR, image_size=IMAGE_SIZE, max_images=NUM_IMAGES_TO_PROCESS):
+    """Carrega até `max_images` imagens rotuladas, normalizadas para [0, 1]."""
+    from PIL import Image
+
+    images_list = []
+    labels_list = []
+    for galaxy_id, label in zip(galaxy_ids, labels):
+        if len(images_list) >= max_images:
+            break # Parar após processar o número desejado de imagens
+
+        img_path = os.path.join(image_dir, f"{galaxy_id}.jpg")
+        if not os.path.exists(img_path):
+            continue # Pular se a imagem não existir
+
+        try:
+            img = Image.open(img_path).resize((image_size, image_size)).convert('RGB')
+            images_list.append(np.array(img))
+            labels_list.append(label)
+            if len(images_list) % 1000 == 0:
+                print(f"Carregadas {len(images_list)} imagens...")
+        except Exception as e:
+            print(f"Erro ao carregar imagem {img_path}: {e}. Pulando.")
+
+    if not images_list:
+        raise FileNotFoundError("Nenhuma imagem carregada. Verifique o caminho IMAGE_DIR e se o zip foi "
+                                "descompactado corretamente.")
+    return np.array(images_list) / 255.0, np.array(labels_list)
+
+
+# --- 2. Modelo CNN ---
+def build_model(image_size=IMAGE_SIZE, num_classes=NUM_CLASSES):
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout
+
+    model = Sequential([
+        Conv2D(32, (3, 3), activation='relu', input_shape=(image_size, image_size, 3)),
+        MaxPooling2D((2, 2)),
+        Conv2D(64, (3, 3), activation='relu'),
+        MaxPooling2D((2, 2)),
+        Flatten(),
+        Dense(128, activation='relu'),
+        Dropout(0.5), # Regularização para evitar overfitting
+        Dense(num_classes, activation='softmax') # Saída para 3 classes
+    ])
+    model.compile(optimizer='adam',
+                  loss='categorical_crossentropy',
+                  metrics=['accuracy'])
+    return model
+
+
+@instrumented('render')
+def plot_history(history):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 4))
+    plt.subplot(1, 2, 1)
+    plt.plot(history.history['accuracy'], label='Acurácia de Treino')
+    plt.plot(history.history['val_accuracy'], label='Acurácia de Validação')
+    plt.title('Acurácia do Modelo')
+    plt.xlabel('Época')
+    plt.ylabel('Acurácia')
+    plt.legend()
+
+    plt.subplot(1, 2, 2)
+    plt.plot(history.history['loss'], label='Perda de Treino')
+    plt.plot(history.history['val_loss'], label='Perda de Validação')
+    plt.title('Perda do Modelo')
+    plt.xlabel('Época')
+    plt.ylabel('Perda')
+    plt.legend()
+    plt.tight_layout()
+    plt.show()
+
+
+@instrumented('render')
+def plot_prediction_example(model, X_test, y_test):
+    import matplotlib.pyplot as plt
+
+    if len(X_test) == 0:
+        print("Conjunto de teste vazio para demonstração de predição.")
+        return
+
+    sample_image_index = np.random.randint(0, len(X_test))
+    sample_image = X_test[sample_image_index]
+    true_label = np.argmax(y_test[sample_image_index])
+
+    prediction = model.predict(np.expand_dims(sample_image, axis=0))[0]
+    predicted_label = np.argmax(prediction)
+
+    plt.imshow(sample_image)
+    plt.title(f"Real: {CLASS_NAMES.get(true_label, 'Desconhecido')}\n"
+              f"Predito: {CLASS_NAMES.get(predicted_label, 'Desconhecido')} (Confiança: {prediction[predicted_label]:.2f})")
+    plt.axis('off')
+    plt.show()
+
+
+def run(data_dir=DATA_DIR, image_size=IMAGE_SIZE, epochs=EPOCHS, batch_size=BATCH_SIZE,
+        max_images=NUM_IMAGES_TO_PROCESS, show=True):
+    """Treina e avalia a CNN de classificação morfológica do Galaxy Zoo."""
+    from sklearn.model_selection import train_test_split
+
+    galaxy_ids, labels = load_labels(os.path.join(data_dir, 'training_solutions.csv'))
+    X, y_int = load_images(galaxy_ids, labels, os.path.join(data_dir, 'images'), image_size, max_images)
+
+    # TensorFlow só é importado depois que os dados já foram lidos
+    from tensorflow.keras.utils import to_categorical
+    y = to_categorical(y_int, num_classes=NUM_CLASSES) # One-hot encoding dos rótulos
+
+    X_train, X_temp, y_train, y_temp = train_test_split(X, y, test_size=0.3, random_state=42)
+    X_val, X_test, y_val, y_test = train_test_split(X_temp, y_temp, test_size=0.5, random_state=42)
+    print(f"Dados prontos: Treino={len(X_train)}, Validação={len(X_val)}, Teste={len(X_test)}")
+
+    model = build_model(image_size)
+    model.summary()
+
+    print("Iniciando treinamento do modelo...")
+    with stage('fit', rows=len(X_train)):
+        history = model.fit(X_train, y_train,
+                            epochs=epochs,
+                            batch_size=batch_size,
+                            validation_data=(X_val, y_val))
+    print("Treinamento concluído.")
+
+    with stage('query', rows=len(X_test)):
+        loss, accuracy = model.evaluate(X_test, y_test, verbose=0)
+    print(f"\nAcurácia no conjunto de teste: {accuracy:.4f}")
+
+    if show:
+        plot_history(history)
+        plot_prediction_example(model, X_test, y_test)
+    print("Classificador de galáxias com CNN concluído.")
+    return model
@@ -0,0 +1,89 @@
+from . import catalog
+from .instrumentation import stage
+
+# --- Parâmetros ---
+COLOR_COLS = ['u_g', 'g_r', 'r_i', 'i_z']
+FEATURES = catalog.MAGNITUDE_COLS + COLOR_COLS
+N_NEIGHBORS = 5
+
+
+def load_features(csv_path=catalog.CSV_FILE):
+    """Magnitudes e cores (características) e classe (rótulo) dos objetos do SDSS."""
+    required_cols = catalog.MAGNITUDE_COLS + ['class']
+    df = catalog.load_sdss_catalog(csv_path, required_cols=required_cols + ['redshift'], dropna_cols=required_cols)
+
+    # Cores (diferença entre magnitudes) como características adicionais
+    with stage('transform', rows=len(df)):
+        df['u_g'] = df['u'] - df['g']
+        df['g_r'] = df['g'] - df['r']
+        df['r_i'] = df['r'] - df['i']
+        df['i_z'] = df['i'] - df['z']
+
+    print(f"Dados processados para ML: {len(df)} linhas.")
+    print(f"Características usadas: {FEATURES}")
+    print(f"Classes encontradas: {df['class'].unique()}")
+    return df[FEATURES], df['class']
+
+
+def train_knn(X, y, n_neighbors=N_NEIGHBORS, test_size=0.3, random_state=42):
+    """
+    Codifica os rótulos, divide treino/teste, escala as características e
+    treina um KNN. Retorna (modelo, scaler, label_encoder, X_test_scaled, y_test).
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler, LabelEncoder
+    from sklearn.neighbors import KNeighborsClassifier
+
+    label_encoder = LabelEncoder()
+    y_encoded = label_encoder.fit_transform(y)
+    class_names = label_encoder.classes_
+    print(f"Classes mapeadas para números: {list(zip(class_names, range(len(class_names))))}")
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y_encoded, test_size=test_size, random_state=random_state)
+    print(f"Dados para ML divididos: Treino={len(X_train)}, Teste={len(X_test)}")
+
+    # Escalar as características é crucial para muitos algoritmos de ML
+    with stage('transform', rows=len(X)):
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+
+    print("Treinando o modelo K-Nearest Neighbors...")
+    knn_model = KNeighborsClassifier(n_neighbors=n_neighbors)
+    with stage('fit', rows=len(X_train)):
+        knn_model.fit(X_train_scaled, y_train)
+    print("Treinamento concluído.")
+    return knn_model, scaler, label_encoder, X_test_scaled, y_test
+
+
+def evaluate(model, label_encoder, X_test_scaled, y_test, show=True):
+    from sklearn.metrics import classification_report, confusion_matrix
+
+    with stage('query', rows=len(X_test_scaled)):
+        y_pred = model.predict(X_test_scaled)
+    class_names = label_encoder.classes_
+
+    print("\n--- Relatório de Classificação ---")
+    print(classification_report(y_test, y_pred, target_names=class_names))
+
+    cm = confusion_matrix(y_test, y_pred)
+    if show:
+        import matplotlib.pyplot as plt
+        from sklearn.metrics import ConfusionMatrixDisplay
+
+        print("\n--- Matriz de Confusão ---")
+        with stage('render'):
+            disp = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=class_names)
+            disp.plot(cmap=plt.cm.Blues)
+            plt.title('Matriz de Confusão')
+            plt.show()
+    return cm
+
+
+def run(csv_path=catalog.CSV_FILE, n_neighbors=N_NEIGHBORS, show=True):
+    """Classificação numérica (GALAXY, STAR, QSO) com KNN a partir da fotometria."""
+    X, y = load_features(csv_path)
+    model, scaler, label_encoder, X_test_scaled, y_test = train_knn(X, y, n_neighbors)
+    evaluate(model, label_encoder, X_test_scaled, y_test, show)
+    print("Classificação numérica de galáxias concluída.")
+    return model
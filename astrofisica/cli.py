@@ -0,0 +1,188 @@
+import argparse
+import importlib
+import sys
+
+from . import instrumentation
+
+# Cada subcomando: (nome, módulo, ajuda, argumentos). Os argumentos são
+# (flags, destino, opções do argparse); o destino é o nome do parâmetro de
+# `run()` no módulo. Argumentos omitidos usam o padrão definido no módulo.
+# O módulo só é importado quando o subcomando é executado, de modo que as
+# dependências pesadas (TensorFlow, sklearn, plotly, tkinter...) só são
+# carregadas quando necessárias.
+_SHOW = (('--no-show',), 'show', dict(action='store_false', default=None, help='não mostrar gráficos'))
+_CSV = (('--csv',), 'csv_path', dict(help='catálogo SDSS (padrão: sdss_data.csv)'))
+_SEED = (('--seed',), 'seed', dict(type=int))
+_WORKERS = (('--workers',), 'num_workers', dict(type=int, help='número de processos'))
+
+COMMANDS = [
+    ('explorer', 'explorer', 'Aglomerados de galáxias do SDSS com K-Means (3D)', [
+        _CSV,
+        (('--clusters',), 'n_clusters', dict(type=int)),
+        _SHOW,
+    ]),
+    ('neighborhood', 'neighborhood', 'Densidade de vizinhança e relação cor-densidade', [
+        _CSV,
+        (('--radius',), 'radius', dict(type=float, help='raio de busca em Mpc')),
+        _SHOW,
+    ]),
+    ('classify-numerical', 'classifier_numerical', 'Classificação GALAXY/STAR/QSO com KNN', [
+        _CSV,
+        (('--neighbors',), 'n_neighbors', dict(type=int)),
+        _SHOW,
+    ]),
+    ('classify-cnn', 'classifier_cnn', 'Classificação morfológica do Galaxy Zoo com CNN', [
+        (('--data-dir',), 'data_dir', dict(help='pasta com training_solutions.csv e images/')),
+        (('--epochs',), 'epochs', dict(type=int)),
+        (('--batch-size',), 'batch_size', dict(type=int)),
+        (('--max-images',), 'max_images', dict(type=int)),
+        _SHOW,
+    ]),
+    ('redshift-gui', 'redshift_gui', 'Explorador interativo de galáxias por redshift', [
+        _CSV,
+    ]),
+    ('lens', 'lensing', 'Simulador de lente gravitacional de uma imagem', [
+        (('--image',), 'image_path', dict()),
+        (('--size',), 'image_size', dict(type=int)),
+        (('--strength',), 'lens_strength', dict(type=float)),
+        (('--grid',), 'grid', dict(action='store_true', default=None, help='usar a grade de exemplo')),
+        _SHOW,
+    ]),
+    ('lens-batch', 'lens_batch', 'Lenteamento em lote de uma pasta de imagens (sem gráficos)', [
+        (('--image-dir',), 'image_dir', dict()),
+        (('--output',), 'output_path', dict()),
+        (('--size',), 'image_size', dict(type=int)),
+        (('--strength',), 'lens_strength', dict(type=float)),
+        (('--chunk-size',), 'chunk_size', dict(type=int)),
+    ]),
+    ('ray-shooting', 'ray_shooting', 'Mapa de magnificação por disparo inverso de raios', [
+        (('--kappa-star',), 'kappa_star', dict(type=float)),
+        (('--shear',), 'shear', dict(type=float)),
+        (('--smooth-kappa',), 'smooth_kappa', dict(type=float)),
+        (('--source-half-size',), 'source_half_size', dict(type=float)),
+        (('--pixels',), 'map_pixels', dict(type=int)),
+        (('--rays-per-side',), 'rays_per_side', dict(type=int)),
+        (('--output',), 'output_path', dict()),
+        _WORKERS,
+        _SEED,
+        _SHOW,
+    ]),
+    ('mock-catalog', 'mock_catalog', 'Catálogo sintético com campo gaussiano (lognormal/Zel\'dovich)', [
+        (('--output',), 'output_path', dict()),
+        (('--particles',), 'num_particles', dict(type=int)),
+        (('--method',), 'method', dict(choices=['lognormal', 'zeldovich'])),
+        (('--box',), 'box_size', dict(type=float)),
+        (('--mesh',), 'mesh_size', dict(type=int)),
+        (('--chunk-size',), 'chunk_size', dict(type=int)),
+        _WORKERS,
+        _SEED,
+    ]),
+    ('cosmo-sim', 'cosmo_sim', 'Visualizador 3D de estrutura cósmica simulada', [
+        (('--points',), 'num_points', dict(type=int)),
+        (('--clusters',), 'num_clusters', dict(type=int)),
+        (('--density-factor',), 'cluster_density_factor', dict(type=int)),
+        (('--max-render',), 'max_render_points', dict(type=int)),
+        _SEED,
+        _SHOW,
+    ]),
+    ('atlas', 'thumbnail_atlas', 'Constrói o atlas de miniaturas do Galaxy Zoo', [
+        (('--image-dir',), 'image_dir', dict()),
+        (('--output',), 'atlas_path', dict()),
+        (('--index',), 'index_path', dict()),
+        (('--size',), 'size', dict(type=int)),
+        _WORKERS,
+    ]),
+    ('samples', 'samples', 'Grade de amostras de galáxias a partir do atlas', [
+        (('--image-dir',), 'image_dir', dict()),
+        (('--atlas',), 'atlas_path', dict()),
+        (('--index',), 'index_path', dict()),
+        (('--solutions',), 'solutions_path', dict()),
+        (('--num',), 'num_samples', dict(type=int)),
+        (('--class',), 'class_filter', dict(type=int, choices=[0, 1, 2], help='0=Elíptica, 1=Espiral, 2=Irregular')),
+        _SEED,
+        _SHOW,
+    ]),
+    ('crossmatch', 'crossmatch', 'Casamento posicional (RA/Dec) do SDSS com outro catálogo', [
+        _CSV,
+        (('--other',), 'other_path', dict(help='CSV com colunas ra/dec (padrão: galaxy_positions.csv)')),
+        (('--radius',), 'radius_arcsec', dict(type=float, help='tolerância em segundos de arco')),
+        (('--how',), 'how', dict(choices=['nearest', 'all'], help='par mais próximo ou todos os pares')),
+        (('--output',), 'output_path', dict()),
+        (('--chunk-size',), 'chunk_size', dict(type=int)),
+        _WORKERS,
+    ]),
+    ('sky-index', 'skypix', 'Índice de pixels do céu: consultas por cone/caixa e mapa de contagens', [
+        _CSV,
+        (('--order',), 'order', dict(type=int, help='ordem da pixelização (12 * 4**ordem pixels)')),
+        (('--cone',), 'cone', dict(type=float, nargs=3, metavar=('RA', 'DEC', 'RAIO'), help='cone em graus')),
+        (('--box',), 'box', dict(type=float, nargs=4, metavar=('RA_MIN', 'RA_MAX', 'DEC_MIN', 'DEC_MAX'),
+                                 help='caixa RA/Dec em graus')),
+        (('--map-order',), 'map_order', dict(type=int, help='ordem do mapa de contagens')),
+        _SHOW,
+    ]),
+    ('catalog-store', 'catalog_store', 'Catálogo incremental: cria o armazenamento ou ingere um novo lote', [
+        _CSV,
+        (('--store',), 'store_dir', dict(help='pasta do catálogo incremental (padrão: catalog_store)')),
+        (('--mode',), 'mode', dict(choices=['append', 'update'], help='update substitui objetos com o mesmo objid')),
+        (('--radius',), 'radius', dict(type=float, help='raio de vizinhança em Mpc (só na criação)')),
+        (('--clusters',), 'n_clusters', dict(type=int, help='aglomerados do K-Means (só na criação)')),
+    ]),
+    ('benchmark', 'benchmark', 'Mede os caminhos críticos com entradas sintéticas', [
+        (('--scale',), 'scale', dict(choices=['small', 'medium', 'large'])),
+        (('--rows',), 'rows', dict(type=int, help='linhas do CSV sintético')),
+        (('--images',), 'images', dict(type=int, help='imagens JPEG sintéticas')),
+        (('--particles',), 'particles', dict(type=int, help='partículas do catálogo sintético')),
+        (('--repeat',), 'repeat', dict(type=int)),
+        (('--output',), 'output_path', dict()),
+        (('--compare',), 'baseline_path', dict(help='resultados anteriores para detectar regressões')),
+        (('--workdir',), 'workdir', dict(help='pasta para as entradas sintéticas (padrão: temporária)')),
+        (('--keep',), 'keep', dict(action='store_true', default=None, help='manter as entradas sintéticas')),
+        (('--workers',), 'num_workers', dict(type=int, help='processos dos caminhos paralelos (padrão: 1)')),
+        _SEED,
+    ]),
+]
+
+# Subcomandos cuja função de entrada não se chama `run`
+_ENTRY_POINTS = {'atlas': 'build_atlas', 'mock-catalog': 'stream_mock_catalog'}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m astrofisica',
+                                     description='Estudos de astrofísica computacional e machine learning.')
+    parser.add_argument('--trace', action='store_true',
+                        help='grava tempo de parede, CPU, pico de memória e linhas de cada etapa')
+    parser.add_argument('--trace-dir', default=instrumentation.TRACE_DIR, metavar='PASTA',
+                        help=f'pasta dos traces (padrão: {instrumentation.TRACE_DIR})')
+    parser.add_argument('--profile-stage', metavar='ETAPA',
+                        help='captura um perfil cProfile da etapa (ex.: query, fit); implica --trace')
+    subparsers = parser.add_subparsers(dest='command', metavar='comando')
+    subparsers.required = True
+    for name, module, help_text, arguments in COMMANDS:
+        subparser = subparsers.add_parser(name, help=help_text, description=help_text)
+        subparser.set_defaults(_command=name, _module=module, _params=[dest for _, dest, _ in arguments])
+        for flags, dest, options in arguments:
+            subparser.add_argument(*flags, dest=dest, **options)
+    return parser
+
+
+def run_command(args):
+    module = importlib.import_module(f'{__package__}.{args._module}')
+    entry_point = getattr(module, _ENTRY_POINTS.get(args._command, 'run'))
+    kwargs = {dest: getattr(args, dest) for dest in args._params if getattr(args, dest) is not None}
+    return entry_point(**kwargs)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    tracing = args.trace or args.profile_stage is not None
+    if tracing:
+        instrumentation.start_run(args.command, args.trace_dir, args.profile_stage)
+    try:
+        run_command(args)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if tracing:
+            instrumentation.finish_run()
+    return 0
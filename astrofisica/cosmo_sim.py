@@ -0,0 +1,90 @@
+from .instrumentation import instrumented, stage
+from .mock_catalog import generate_mock_cosmic_structure
+from .octree_index import PointOctree
+
+# --- Parâmetros ---
+MAX_RENDER_POINTS = 200000 # Orçamento de pontos desenhados (subconjunto grosso -> fino da octree)
+
+
+@instrumented('render')
+def plot_plotly(render_data):
+    import plotly.graph_objects as go
+
+    print("Gerando visualização 3D interativa com Plotly...")
+    fig_plotly = go.Figure(data=[go.Scatter3d(
+        x=render_data[:, 0],
+        y=render_data[:, 1],
+        z=render_data[:, 2],
+        mode='markers',
+        marker=dict(
+            size=1,        # Tamanho do marcador
+            opacity=0.7,   # Transparência
+            color=render_data[:, 2], # Colorir por coordenada Z para um gradiente visual
+            colorscale='Viridis', # Esquema de cores
+            colorbar_title="Z Coordinate"
+        )
+    )])
+
+    fig_plotly.update_layout(
+        title='Visualização 3D de Estrutura Cósmica Simulada (Plotly)',
+        scene=dict(
+            xaxis_title='X Axis (Mpc)',
+            yaxis_title='Y Axis (Mpc)',
+            zaxis_title='Z Axis (Mpc)',
+            aspectmode='cube' # Mantém as proporções para uma visualização cúbica
+        ),
+        margin=dict(l=0, r=0, b=0, t=40)
+    )
+
+    fig_plotly.show()
+    print("Visualização Plotly gerada. Verifique seu navegador.")
+
+
+@instrumented('render')
+def plot_matplotlib(render_data, cube_limits):
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D # noqa: F401 (registra a projeção 3d)
+
+    print("Gerando visualização 3D estática com Matplotlib (feche para continuar)...")
+    fig_mpl = plt.figure(figsize=(10, 8))
+    ax_mpl = fig_mpl.add_subplot(111, projection='3d')
+
+    ax_mpl.scatter(render_data[:, 0], render_data[:, 1], render_data[:, 2],
+                   s=0.5, # Tamanho do ponto
+                   alpha=0.5, # Transparência
+                   c=render_data[:, 2], # Colorir por coordenada Z
+                   cmap='viridis')
+
+    ax_mpl.set_xlabel('X Axis (Mpc)')
+    ax_mpl.set_ylabel('Y Axis (Mpc)')
+    ax_mpl.set_zlabel('Z Axis (Mpc)')
+    ax_mpl.set_title('Visualização 3D de Estrutura Cósmica Simulada (Matplotlib)')
+
+    # Limites calculados uma vez na octree, para manter proporções
+    (x_min, x_max), (y_min, y_max), (z_min, z_max) = cube_limits
+    ax_mpl.set_xlim(x_min, x_max)
+    ax_mpl.set_ylim(y_min, y_max)
+    ax_mpl.set_zlim(z_min, z_max)
+
+    plt.show()
+    print("Visualização Matplotlib concluída.")
+
+
+def run(num_points=20000, num_clusters=8, cluster_density_factor=7, seed=42,
+        max_render_points=MAX_RENDER_POINTS, show=True):
+    """Gera a estrutura cósmica sintética e a visualiza em 3D."""
+    with stage('load', rows=num_points):
+        sim_data = generate_mock_cosmic_structure(num_points, num_clusters, cluster_density_factor, seed=seed)
+
+    # Índice octree construído uma vez: consultas por região e subconjuntos por orçamento de pontos
+    with stage('index_build', rows=len(sim_data)):
+        sim_index = PointOctree(sim_data)
+    with stage('query', rows=len(sim_data)):
+        render_data = sim_data[sim_index.sample(max_render_points)]
+    print(f"Desenhando {len(render_data)} de {len(sim_data)} pontos.")
+
+    if show:
+        plot_plotly(render_data)
+        plot_matplotlib(render_data, sim_index.cube_limits())
+    print("Visualizador de simulações concluído.")
+    return sim_data, sim_index
@@ -0,0 +1,192 @@
+import os
+
+import numpy as np
+
+from . import catalog
+from .instrumentation import stage
+
+# --- Parâmetros ---
+MATCH_RADIUS_ARCSEC = 1.0 # Tolerância angular para considerar duas fontes a mesma (segundos de arco)
+CHUNK_SIZE = 500000 # Fontes consultadas por bloco (limita a memória das listas de pares)
+NUM_WORKERS = os.cpu_count() or 1 # Threads usadas pela KDTree em cada bloco
+OTHER_FILE = 'galaxy_positions.csv' # Catálogo externo com colunas ra/dec (ex.: posições do Galaxy Zoo)
+OUTPUT_FILE = 'crossmatch.csv'
+
+ARCSEC_PER_RAD = np.degrees(1.0) * 3600.0
+
+
+# --- 1. Geometria na Esfera ---
+def radec_to_unit(ra, dec):
+    """Converte RA/Dec (graus) em vetores unitários (N, 3)."""
+    ra_rad = np.deg2rad(np.asarray(ra, dtype=np.float64))
+    dec_rad = np.deg2rad(np.asarray(dec, dtype=np.float64))
+    cos_dec = np.cos(dec_rad)
+    return np.column_stack([cos_dec * np.cos(ra_rad), cos_dec * np.sin(ra_rad), np.sin(dec_rad)])
+
+
+def arcsec_to_chord(radius_arcsec):
+    """Distância euclidiana (corda) entre vetores unitários separados por `radius_arcsec`."""
+    return 2.0 * np.sin(np.asarray(radius_arcsec, dtype=np.float64) / ARCSEC_PER_RAD / 2.0)
+
+
+def chord_to_arcsec(chord):
+    """Inverso de arcsec_to_chord: separação angular (segundos de arco) a partir da corda."""
+    return 2.0 * np.arcsin(np.clip(np.asarray(chord, dtype=np.float64) / 2.0, 0.0, 1.0)) * ARCSEC_PER_RAD
+
+
+def angular_separation(ra1, dec1, ra2, dec2):
+    """Separação angular (segundos de arco) entre pares de posições em graus."""
+    return chord_to_arcsec(np.linalg.norm(radec_to_unit(ra1, dec1) - radec_to_unit(ra2, dec2), axis=1))
+
+
+# --- 2. Casamento Posicional ---
+class SkyMatcher:
+    """
+    Catálogo de referência indexado uma única vez: RA/Dec viram vetores
+    unitários em uma KDTree, e a tolerância angular vira uma distância de
+    corda. Cada consulta custa O(log M) por fonte em vez de O(M).
+    """
+
+    def __init__(self, ra, dec, leafsize=16):
+        from scipy.spatial import cKDTree
+
+        self.ra = np.asarray(ra, dtype=np.float64)
+        self.dec = np.asarray(dec, dtype=np.float64)
+        with stage('index_build', rows=len(self.ra)):
+            self.tree = cKDTree(radec_to_unit(self.ra, self.dec), leafsize=leafsize)
+
+    def __len__(self):
+        return self.tree.n
+
+    def nearest(self, ra, dec, radius_arcsec=MATCH_RADIUS_ARCSEC, chunk_size=CHUNK_SIZE, num_workers=NUM_WORKERS):
+        """
+        Vizinho mais próximo de cada fonte dentro da tolerância. Retorna
+        (índices no catálogo de referência, separações em arcsec); fontes
+        sem par recebem índice -1 e separação NaN.
+        """
+        ra = np.asarray(ra, dtype=np.float64)
+        dec = np.asarray(dec, dtype=np.float64)
+        chord = float(arcsec_to_chord(radius_arcsec))
+        indices = np.full(len(ra), -1, dtype=np.int64)
+        separations = np.full(len(ra), np.nan)
+
+        for start in range(0, len(ra), chunk_size):
+            stop = min(start + chunk_size, len(ra))
+            with stage('query', rows=stop - start):
+                points = radec_to_unit(ra[start:stop], dec[start:stop])
+                distance, index = self.tree.query(points, k=1, distance_upper_bound=chord, workers=num_workers)
+                found = np.isfinite(distance) # Sem par: distância infinita e índice == len(tree)
+                indices[start:stop][found] = index[found]
+                separations[start:stop][found] = chord_to_arcsec(distance[found])
+        return indices, separations
+
+    def all_matches(self, ra, dec, radius_arcsec=MATCH_RADIUS_ARCSEC, chunk_size=CHUNK_SIZE,
+                    num_workers=NUM_WORKERS):
+        """
+        Todos os pares dentro da tolerância. Retorna (índices das fontes,
+        índices no catálogo de referência, separações em arcsec), ordenados
+        por fonte e, dentro de cada fonte, por separação.
+        """
+        ra = np.asarray(ra, dtype=np.float64)
+        dec = np.asarray(dec, dtype=np.float64)
+        chord = float(arcsec_to_chord(radius_arcsec))
+        query_parts, ref_parts, sep_parts = [], [], []
+
+        for start in range(0, len(ra), chunk_size):
+            stop = min(start + chunk_size, len(ra))
+            with stage('query', rows=stop - start):
+                points = radec_to_unit(ra[start:stop], dec[start:stop])
+                neighbors = self.tree.query_ball_point(points, chord, workers=num_workers)
+                counts = np.fromiter(map(len, neighbors), dtype=np.int64, count=len(neighbors))
+                ref_index = np.fromiter((j for row in neighbors for j in row), dtype=np.int64, count=counts.sum())
+                query_index = np.repeat(np.arange(start, stop, dtype=np.int64), counts)
+                chords = np.linalg.norm(points[query_index - start] - self.tree.data[ref_index], axis=1)
+
+            query_parts.append(query_index)
+            ref_parts.append(ref_index)
+            sep_parts.append(chord_to_arcsec(chords))
+
+        if not query_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        query_index = np.concatenate(query_parts)
+        ref_index = np.concatenate(ref_parts)
+        separations = np.concatenate(sep_parts)
+        order = np.lexsort((separations, query_index))
+        return query_index[order], ref_index[order], separations[order]
+
+
+# --- 3. Junção de Catálogos ---
+def crossmatch(left_df, right_df, radius_arcsec=MATCH_RADIUS_ARCSEC, how='nearest', suffixes=('', '_match'),
+               matcher=None, chunk_size=CHUNK_SIZE, num_workers=NUM_WORKERS):
+    """
+    Junta dois DataFrames com colunas 'ra'/'dec' pela posição no céu.
+    how='nearest': uma linha por fonte de `left_df` com par em `right_df`;
+    how='all': uma linha por par dentro da tolerância. A coluna
+    'separation_arcsec' guarda a separação. A KDTree é construída sobre
+    `right_df` (ou reaproveitada via `matcher`).
+    """
+    if how not in ('nearest', 'all'):
+        raise ValueError(f"Modo de casamento desconhecido: {how!r} (use 'nearest' ou 'all').")
+    catalog.require_columns(left_df, ['ra', 'dec'])
+    catalog.require_columns(right_df, ['ra', 'dec'])
+    if matcher is None:
+        matcher = SkyMatcher(right_df['ra'].to_numpy(), right_df['dec'].to_numpy())
+
+    if how == 'nearest':
+        ref_index, separations = matcher.nearest(left_df['ra'].to_numpy(), left_df['dec'].to_numpy(),
+                                                 radius_arcsec, chunk_size, num_workers)
+        query_index = np.flatnonzero(ref_index >= 0)
+        ref_index = ref_index[query_index]
+        separations = separations[query_index]
+    else:
+        query_index, ref_index, separations = matcher.all_matches(left_df['ra'].to_numpy(), left_df['dec'].to_numpy(),
+                                                                  radius_arcsec, chunk_size, num_workers)
+
+    left = left_df.iloc[query_index].reset_index(drop=True)
+    right = right_df.iloc[ref_index].reset_index(drop=True)
+    overlap = set(left.columns) & set(right.columns)
+    left.columns = [col + suffixes[0] if col in overlap else col for col in left.columns]
+    right.columns = [col + suffixes[1] if col in overlap else col for col in right.columns]
+    matched = left.join(right)
+    matched['separation_arcsec'] = separations
+    return matched
+
+
+def read_position_catalog(path):
+    """Lê um CSV com colunas ra/dec (nomes normalizados para minúsculas)."""
+    import pandas as pd
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} não encontrado. Certifique-se de que o arquivo está na mesma pasta.")
+    with stage('load') as record:
+        df = pd.read_csv(path, low_memory=False)
+        record['rows'] = len(df)
+    df.columns = df.columns.str.lower()
+    catalog.require_columns(df, ['ra', 'dec'])
+    return df.dropna(subset=['ra', 'dec']).reset_index(drop=True)
+
+
+def run(csv_path=catalog.CSV_FILE, other_path=OTHER_FILE, radius_arcsec=MATCH_RADIUS_ARCSEC, how='nearest',
+        output_path=OUTPUT_FILE, chunk_size=CHUNK_SIZE, num_workers=NUM_WORKERS):
+    """
+    Casa o catálogo SDSS com um catálogo externo de posições (por exemplo,
+    GalaxyID/ra/dec do Galaxy Zoo) e grava os pares em `output_path`.
+    """
+    with stage('load') as record:
+        sdss_df = catalog.read_sdss_csv(csv_path)
+        record['rows'] = len(sdss_df)
+    catalog.require_columns(sdss_df, ['ra', 'dec'])
+    sdss_df = sdss_df.dropna(subset=['ra', 'dec']).reset_index(drop=True)
+    other_df = read_position_catalog(other_path)
+
+    print(f"Casando {len(sdss_df)} fontes do SDSS com {len(other_df)} fontes de '{other_path}' "
+          f"(tolerância de {radius_arcsec}\", modo '{how}')...")
+    matched = crossmatch(sdss_df, other_df, radius_arcsec, how, chunk_size=chunk_size, num_workers=num_workers)
+    print(f"{len(matched)} pares encontrados.")
+    if len(matched):
+        print(f"Separação mediana: {matched['separation_arcsec'].median():.3f}\"")
+
+    with stage('export', rows=len(matched)):
+        matched.to_csv(output_path, index=False)
+    print(f"Pares gravados em '{output_path}'.")
+    return matched
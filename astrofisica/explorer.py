@@ -0,0 +1,75 @@
+from . import catalog
+from .instrumentation import instrumented, stage
+
+# --- Parâmetros ---
+N_CLUSTERS = 50
+
+
+def fit_clusters(coords, n_clusters=N_CLUSTERS, random_state=42):
+    """Ajusta o K-Means às coordenadas 3D e retorna o modelo (centros em `cluster_centers_`)."""
+    from sklearn.cluster import KMeans
+
+    kmeans = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10)
+    with stage('fit', rows=len(coords)):
+        kmeans.fit(coords)
+    return kmeans
+
+
+def cluster_galaxies(df, n_clusters=N_CLUSTERS, random_state=42):
+    """Agrupamento K-Means das coordenadas 3D (coluna 'cluster_id')."""
+    print("Executando K-Means para identificar aglomerados...")
+    kmeans = fit_clusters(catalog.cartesian_coords(df), n_clusters, random_state)
+    df['cluster_id'] = kmeans.labels_
+    print("Agrupamento concluído.")
+    return df
+
+
+def assign_clusters(coords, centers):
+    """Rótulo do centro mais próximo de cada ponto, sem reajustar o K-Means."""
+    from scipy.spatial import cKDTree
+
+    with stage('query', rows=len(coords)):
+        return cKDTree(centers).query(coords, workers=-1)[1]
+
+
+@instrumented('render')
+def plot_clusters_3d(df):
+    import plotly.express as px
+
+    print("Gerando visualização 3D interativa (pode levar alguns segundos)...")
+    fig = px.scatter_3d(df, x='x', y='y', z='z_cartesian',
+                        color='cluster_id',
+                        size_max=2, opacity=0.7,
+                        title='Distribuição 3D de Galáxias e Aglomerados',
+                        labels={'x': 'Distância X (Mpc)', 'y': 'Distância Y (Mpc)', 'z_cartesian': 'Distância Z (Mpc)'})
+
+    fig.update_traces(marker=dict(size=1))
+    fig.show()
+    print("Visualização gerada. Verifique seu navegador.")
+
+
+@instrumented('render')
+def plot_clusters_2d(df):
+    import matplotlib.pyplot as plt
+
+    print("Gerando visualização 2D com Matplotlib (feche para continuar)...")
+    plt.figure(figsize=(10, 8))
+    plt.scatter(df['x'], df['y'], s=1, c=df['cluster_id'], cmap='viridis', alpha=0.5)
+    plt.xlabel('X (Mpc)')
+    plt.ylabel('Y (Mpc)')
+    plt.title('Distribuição 2D de Galáxias (Projeção XY)')
+    plt.colorbar(label='ID do Aglomerado')
+    plt.grid(True)
+    plt.show()
+    print("Visualização 2D concluída.")
+
+
+def run(csv_path=catalog.CSV_FILE, n_clusters=N_CLUSTERS, show=True):
+    """Carrega o catálogo, identifica aglomerados e (opcionalmente) mostra os gráficos."""
+    df = catalog.load_sdss_catalog(csv_path)
+    catalog.add_cartesian_coords(df)
+    cluster_galaxies(df, n_clusters)
+    if show:
+        plot_clusters_3d(df)
+        plot_clusters_2d(df)
+    return df
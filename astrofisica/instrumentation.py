@@ -0,0 +1,194 @@
+import contextlib
+import cProfile
+import csv
+import functools
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError: # Windows: sem getrusage, o pico de RSS não é registrado
+    resource = None
+
+# --- Parâmetros ---
+TRACE_DIR = 'traces' # Pasta onde os traces (JSON/CSV) e perfis são gravados
+CSV_FIELDS = ['run_id', 'index', 'stage', 'parent', 'depth', 'start_s', 'wall_s', 'cpu_s', 'children_cpu_s', 'rows',
+              'process_peak_rss_mb', 'process_peak_rss_growth_mb', 'children_peak_rss_mb']
+# Significado dos campos, gravado também no JSON. O pico de RSS vem de getrusage: é o máximo
+# da vida inteira do processo (ou dos filhos já encerrados), não o pico dentro da etapa.
+FIELD_DESCRIPTIONS = {
+    'start_s': 'início da etapa, em segundos desde o início da execução',
+    'wall_s': 'tempo de parede da etapa',
+    'cpu_s': 'tempo de CPU da etapa: processo atual + processos filhos encerrados durante a etapa',
+    'children_cpu_s': 'parte de cpu_s gasta em processos filhos (workers de Pool)',
+    'process_peak_rss_mb': 'pico de RSS do processo desde o seu início, medido ao fim da etapa',
+    'process_peak_rss_growth_mb': 'quanto esse pico subiu durante a etapa (0 se a etapa ficou abaixo do pico anterior)',
+    'children_peak_rss_mb': 'maior pico de RSS entre todos os processos filhos já encerrados, ao fim da etapa',
+}
+
+
+def peak_rss_mb(who='self'):
+    """Pico de memória residente (MB) do processo (ou dos filhos já encerrados)."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == 'self' else resource.RUSAGE_CHILDREN)
+    # ru_maxrss é em bytes no macOS e em kilobytes no Linux
+    return usage.ru_maxrss / 2**20 if sys.platform == 'darwin' else usage.ru_maxrss / 1024
+
+
+def cpu_times():
+    """(CPU do processo, CPU dos filhos já encerrados) em segundos, usuário + sistema."""
+    times = os.times()
+    return times.user + times.system, times.children_user + times.children_system
+
+
+# --- 1. Trace de uma Execução ---
+class Trace:
+    """
+    Registro das etapas (carregar, limpar, transformar, construir índice,
+    consultar, ajustar, renderizar, exportar...) de uma execução: tempo de
+    parede, tempo de CPU, pico de RSS e número de linhas de cada etapa.
+    Opcionalmente captura um perfil cProfile de uma etapa escolhida.
+    """
+
+    def __init__(self, name='run', output_dir=TRACE_DIR, profile_stage=None, enabled=True):
+        self.name = name
+        self.enabled = enabled
+        self.run_id = f"{name}_{time.strftime('%Y%m%d_%H%M%S')}"
+        self.output_dir = output_dir
+        self.profile_stage = profile_stage
+        self.records = []
+        self._stack = []
+        self._profiler = None
+        self._profiling = False
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None, **extra):
+        """
+        Mede o bloco como a etapa `name`. O registro é devolvido para que o
+        bloco possa informar o número de linhas: `record['rows'] = len(df)`.
+        """
+        if not self.enabled:
+            yield dict(stage=name, rows=rows, **extra)
+            return
+
+        record = dict(run_id=self.run_id, index=len(self.records), stage=name,
+                      parent=self._stack[-1]['stage'] if self._stack else None, depth=len(self._stack),
+                      rows=rows, **extra)
+        self.records.append(record)
+        self._stack.append(record)
+
+        profile = name == self.profile_stage and not self._profiling
+        if profile:
+            if self._profiler is None:
+                self._profiler = cProfile.Profile()
+            self._profiling = True
+            self._profiler.enable()
+
+        rss_before = peak_rss_mb()
+        cpu_start, children_cpu_start = cpu_times()
+        wall_start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['start_s'] = wall_start - self._start
+            record['wall_s'] = time.perf_counter() - wall_start
+            cpu_end, children_cpu_end = cpu_times()
+            # Workers de Pool só entram aqui depois de encerrados (o `with Pool` já faz isso)
+            record['children_cpu_s'] = children_cpu_end - children_cpu_start
+            record['cpu_s'] = cpu_end - cpu_start + record['children_cpu_s']
+            if profile:
+                self._profiler.disable()
+                self._profiling = False
+            record['process_peak_rss_mb'] = peak_rss_mb()
+            record['process_peak_rss_growth_mb'] = (None if rss_before is None
+                                                    else record['process_peak_rss_mb'] - rss_before)
+            record['children_peak_rss_mb'] = peak_rss_mb('children')
+            self._stack.pop()
+
+    def summary(self):
+        """Totais por nome de etapa (número de chamadas, tempos e linhas)."""
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record['stage'], dict(stage=record['stage'], calls=0, wall_s=0.0,
+                                                            cpu_s=0.0, rows=0))
+            total['calls'] += 1
+            total['wall_s'] += record.get('wall_s', 0.0)
+            total['cpu_s'] += record.get('cpu_s', 0.0)
+            total['rows'] += record['rows'] or 0
+        return list(totals.values())
+
+    def write(self):
+        """Grava <run_id>.json, <run_id>.csv e, se houver, <run_id>_<etapa>.prof. Retorna o caminho do JSON."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, self.run_id)
+
+        profile_path = None
+        if self._profiler is not None:
+            profile_path = f"{base}_{self.profile_stage}.prof"
+            self._profiler.dump_stats(profile_path)
+
+        report = dict(run_id=self.run_id, name=self.name, argv=sys.argv, total_wall_s=time.perf_counter() - self._start,
+                      process_peak_rss_mb=peak_rss_mb(), children_peak_rss_mb=peak_rss_mb('children'),
+                      profile_stage=self.profile_stage, profile=profile_path, fields=FIELD_DESCRIPTIONS,
+                      summary=self.summary(), stages=self.records)
+        with open(base + '.json', 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        with open(base + '.csv', 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(self.records)
+        return base + '.json'
+
+    def print_summary(self):
+        print(f"{'etapa':<16} {'chamadas':>8} {'parede (s)':>11} {'CPU (s)':>9} {'linhas':>10}")
+        for total in self.summary():
+            print(f"{total['stage']:<16} {total['calls']:>8} {total['wall_s']:>11.3f} {total['cpu_s']:>9.3f} "
+                  f"{total['rows']:>10}")
+
+
+# --- 2. Trace Ativo ---
+# Sem uma execução iniciada, as etapas vão para um trace desativado, que não
+# mede nem guarda nada.
+_active = Trace(name='inactive', enabled=False)
+
+
+def get_trace():
+    return _active
+
+
+def start_run(name, output_dir=TRACE_DIR, profile_stage=None):
+    """Inicia um novo trace ativo para a execução `name`."""
+    global _active
+    _active = Trace(name, output_dir, profile_stage)
+    return _active
+
+
+def finish_run():
+    """Grava o trace ativo, imprime o resumo e volta ao trace inativo. Retorna o caminho do JSON."""
+    global _active
+    trace = _active
+    path = trace.write()
+    trace.print_summary()
+    print(f"Trace gravado em '{path}'.")
+    _active = Trace(name='inactive', enabled=False)
+    return path
+
+
+def stage(name, rows=None, **extra):
+    """Etapa no trace ativo (gerenciador de contexto)."""
+    return _active.stage(name, rows, **extra)
+
+
+def instrumented(stage_name):
+    """Decorador: mede cada chamada da função como a etapa `stage_name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _active.stage(stage_name, function=func.__qualname__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,327 @@
+import os
+import glob
+import hashlib
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+from .instrumentation import stage
+
+# --- Parâmetros ---
+IMAGE_DIR = 'images' # Pasta com as imagens do Galaxy Zoo a serem lenteadas
+OUTPUT_FILE = 'lensed_images.npz' # Arquivo comprimido com as imagens lenteadas
+IMAGE_SIZE = 256 # Tamanho da imagem (pixels x pixels)
+LENS_STRENGTH = 50 # Força da lente (mesmo significado de grav_lens_sim.py)
+CHUNK_SIZE = 256 # Número de imagens processadas (e mantidas em memória) por vez
+CACHE_DIR = '.lens_cache' # Cache em disco dos campos de deflexão (None para desativar)
+CACHE_MAX_ENTRIES = 16 # Número máximo de campos mantidos em memória
+CACHE_MAX_DISK_ENTRIES = 64 # Número máximo de campos mantidos em disco
+
+
+# --- 1. Campo de Coordenadas da Fonte (Calculado uma Vez por Configuração) ---
+def image_shape(image_size):
+    """(altura, largura) a partir de um tamanho inteiro (imagem quadrada) ou de um par."""
+    if np.ndim(image_size) == 0:
+        return int(image_size), int(image_size)
+    height, width = image_size
+    return int(height), int(width)
+
+
+def compute_source_coords(image_size, lens_strength, center_x=None, center_y=None):
+    """
+    Calcula as coordenadas no plano da fonte para cada pixel da imagem lenteada,
+    com o mesmo modelo simplificado de grav_lens_sim.py. `image_size` é um
+    inteiro (imagem quadrada) ou (altura, largura).
+    Retorna um array (2, altura, largura) com (y_fonte, x_fonte).
+    """
+    height, width = image_shape(image_size)
+    if center_x is None:
+        center_x = width // 2
+    if center_y is None:
+        center_y = height // 2
+
+    x_lens = np.arange(width) - center_x
+    y_lens = np.arange(height) - center_y
+    X_lens, Y_lens = np.meshgrid(x_lens, y_lens)
+
+    R2_lens = (X_lens**2 + Y_lens**2).astype(np.float64)
+    R2_lens[R2_lens == 0] = 1e-18 # Mesmo valor efetivo de R_lens = 1e-9 no script original
+
+    alpha_x = -lens_strength * (X_lens / R2_lens)
+    alpha_y = -lens_strength * (Y_lens / R2_lens)
+
+    source_coords_y = (Y_lens + alpha_y) + center_y
+    source_coords_x = (X_lens + alpha_x) + center_x
+    return np.stack([source_coords_y, source_coords_x])
+
+
+class BilinearField:
+    """
+    Pesos e índices de interpolação bilinear pré-calculados a partir de um campo
+    de coordenadas. Aplicar o campo a uma pilha de imagens vira apenas leitura
+    indexada, sem recalcular a grade para cada imagem.
+    Reproduz map_coordinates(..., order=1, cval=cval) (modo 'constant').
+    """
+
+    def __init__(self, coords, input_shape):
+        height, width = input_shape
+        self.coords = coords
+        coords_y, coords_x = coords[0], coords[1]
+        self.output_shape = coords_y.shape
+        self.input_shape = (height, width)
+
+        # Pontos fora da imagem de origem recebem cval (mesmo critério do scipy)
+        self.valid = (coords_y >= 0) & (coords_y <= height - 1) & (coords_x >= 0) & (coords_x <= width - 1)
+
+        i0 = np.clip(np.floor(coords_y), 0, max(height - 2, 0)).astype(np.intp)
+        j0 = np.clip(np.floor(coords_x), 0, max(width - 2, 0)).astype(np.intp)
+        fy = np.clip(coords_y - i0, 0, 1)
+        fx = np.clip(coords_x - j0, 0, 1)
+        i1 = np.minimum(i0 + 1, height - 1)
+        j1 = np.minimum(j0 + 1, width - 1)
+
+        # Índices lineares na imagem achatada (H*W) e pesos dos 4 vizinhos
+        self.indices = np.stack([i0 * width + j0, i0 * width + j1, i1 * width + j0, i1 * width + j1]).reshape(4, -1)
+        self.weights = np.stack([(1 - fy) * (1 - fx), (1 - fy) * fx, fy * (1 - fx), fy * fx]).reshape(4, -1)
+        self.weights[:, ~self.valid.ravel()] = 0
+        self.weights = self.weights.astype(np.float32)
+
+    def apply(self, stack, cval=0):
+        """
+        Aplica o campo a uma pilha (N, H, W) ou (N, H, W, C).
+        Retorna um array float32 com o formato de saída do campo.
+        """
+        stack = np.asarray(stack)
+        n = stack.shape[0]
+        channels = stack.shape[3:] # () para escala de cinza, (C,) para RGB
+        flat = stack.reshape(n, self.input_shape[0] * self.input_shape[1], *channels).astype(np.float32, copy=False)
+
+        out = np.zeros((n, self.indices.shape[1], *channels), dtype=np.float32)
+        for k in range(4):
+            weight = self.weights[k].reshape(1, -1, *([1] * len(channels)))
+            out += weight * flat[:, self.indices[k]]
+
+        if cval != 0:
+            out[:, ~self.valid.ravel()] = cval
+        return out.reshape(n, *self.output_shape, *channels)
+
+
+# --- 2. Cache LRU dos Campos (Memória + Disco) ---
+class DeflectionFieldCache:
+    """
+    Cache LRU de campos de coordenadas por configuração de lente.
+    Mantém até `max_entries` campos em memória e até `max_disk_entries`
+    arquivos .npy em `cache_dir` (os menos usados recentemente são removidos).
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, cache_dir=CACHE_DIR, max_disk_entries=CACHE_MAX_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(image_size, lens_strength, center_x, center_y):
+        height, width = image_shape(image_size)
+        params = f"{height}x{width}|{float(lens_strength)!r}|{float(center_x)!r}|{float(center_y)!r}"
+        return hashlib.sha1(params.encode()).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"lens_field_{key}.npy")
+
+    def _remember(self, key, field):
+        self._memory[key] = field
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        files = glob.glob(os.path.join(self.cache_dir, 'lens_field_*.npy'))
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=os.path.getmtime) # Mais antigos (menos usados) primeiro
+        for path in files[:len(files) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get(self, image_size, lens_strength, center_x=None, center_y=None):
+        """
+        Retorna um BilinearField para a configuração, calculando-o só se
+        necessário. `image_size` é um inteiro ou (altura, largura).
+        """
+        height, width = image_shape(image_size)
+        if center_x is None:
+            center_x = width // 2
+        if center_y is None:
+            center_y = height // 2
+        key = self.make_key(image_size, lens_strength, center_x, center_y)
+
+        if key in self._memory:
+            self.hits += 1
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        coords = None
+        if self.cache_dir is not None:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                try:
+                    coords = np.load(path)
+                    os.utime(path) # Marca como usado recentemente
+                    self.hits += 1
+                except (OSError, ValueError):
+                    coords = None
+
+        if coords is None:
+            self.misses += 1
+            coords = compute_source_coords(image_size, lens_strength, center_x, center_y)
+            if self.cache_dir is not None:
+                # Escreve em arquivo temporário e renomeia para não deixar arquivos parciais
+                tmp_path = self._disk_path(key) + f".{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, coords)
+                os.replace(tmp_path, self._disk_path(key))
+                self._evict_disk()
+
+        field = BilinearField(coords, (height, width))
+        self._remember(key, field)
+        return field
+
+
+# --- 3. Lenteamento em Lote ---
+def lens_stack(images, field, order=1, cval=0):
+    """
+    Lenteia uma pilha de imagens (N, H, W) ou (N, H, W, C) com um campo já calculado.
+    `field` pode ser um BilinearField ou um array de coordenadas (2, H, W).
+    Para order != 1, usa map_coordinates imagem a imagem.
+    """
+    if order == 1:
+        if not isinstance(field, BilinearField):
+            field = BilinearField(field, np.asarray(images).shape[1:3])
+        return field.apply(images, cval=cval)
+
+    from scipy.ndimage import map_coordinates # Só necessário para interpolação de ordem > 1
+
+    coords = field.coords if isinstance(field, BilinearField) else np.asarray(field)
+    images = np.asarray(images)
+    out = np.empty(images.shape[:1] + coords.shape[1:] + images.shape[3:], dtype=np.float32)
+    for n, img in enumerate(images):
+        if img.ndim == 2:
+            out[n] = map_coordinates(img, coords, order=order, cval=cval)
+        else:
+            for ch in range(img.shape[2]):
+                out[n, ..., ch] = map_coordinates(img[..., ch], coords, order=order, cval=cval)
+    return out
+
+
+def lens_sweep(image, lens_strengths=None, centers=None, cache=None, cval=0):
+    """
+    Lenteia uma imagem (H, W) ou (H, W, C) para uma varredura de parâmetros,
+    produzindo uma pilha de quadros (para animações ou conjuntos de treino).
+    `lens_strengths` e `centers` (lista de (x, y)) são combinados em produto cartesiano.
+    """
+    image = np.asarray(image)
+    image_size = image.shape[:2] # (altura, largura); imagens não quadradas também funcionam
+    if cache is None:
+        cache = DeflectionFieldCache(cache_dir=None)
+    if lens_strengths is None:
+        lens_strengths = [LENS_STRENGTH]
+    if centers is None:
+        centers = [(image_size[1] // 2, image_size[0] // 2)]
+
+    frames = []
+    params = []
+    for strength in lens_strengths:
+        for center_x, center_y in centers:
+            field = cache.get(image_size, strength, center_x, center_y)
+            frames.append(field.apply(image[np.newaxis], cval=cval)[0])
+            params.append((strength, center_x, center_y))
+    return np.stack(frames), np.array(params, dtype=np.float64)
+
+
+# --- 4. Armazenamento Comprimido (Sem Plotagem) ---
+def load_image_stack(paths, size, mode='L'):
+    """Carrega e redimensiona uma lista de imagens em um array uint8 (N, H, W[, C])."""
+    from PIL import Image
+
+    images = []
+    for path in paths:
+        img = Image.open(path).convert(mode).resize((size, size))
+        images.append(np.asarray(img, dtype=np.uint8))
+    return np.stack(images)
+
+
+def _write_npz_entry(zf, name, array):
+    # Mesmo formato usado por np.savez_compressed, mas entrada a entrada
+    with zf.open(name + '.npy', 'w', force_zip64=True) as f:
+        np.lib.format.write_array(f, np.asanyarray(array), allow_pickle=False)
+
+
+def lens_image_files(paths, output_path, image_size=IMAGE_SIZE, lens_strength=LENS_STRENGTH,
+                     center_x=None, center_y=None, chunk_size=CHUNK_SIZE, mode='L', cache=None):
+    """
+    Lenteia uma lista de arquivos de imagem com uma configuração de lente
+    compartilhada e grava o resultado em um .npz comprimido, em blocos de
+    `chunk_size` imagens (memória limitada). Cada bloco vira as entradas
+    'images_XXXXX' e 'ids_XXXXX'. Retorna o número de imagens gravadas.
+    """
+    if cache is None:
+        cache = DeflectionFieldCache()
+    with stage('index_build', rows=image_size * image_size):
+        field = cache.get(image_size, lens_strength, center_x, center_y)
+
+    written = 0
+    with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for chunk_index, start in enumerate(range(0, len(paths), chunk_size)):
+            chunk_paths = paths[start:start + chunk_size]
+            with stage('load', rows=len(chunk_paths)):
+                stack = load_image_stack(chunk_paths, image_size, mode=mode)
+            with stage('transform', rows=len(chunk_paths)):
+                lensed = np.clip(np.rint(field.apply(stack)), 0, 255).astype(np.uint8)
+            ids = np.array([os.path.splitext(os.path.basename(p))[0] for p in chunk_paths])
+
+            with stage('export', rows=len(chunk_paths)):
+                _write_npz_entry(zf, f"images_{chunk_index:05d}", lensed)
+                _write_npz_entry(zf, f"ids_{chunk_index:05d}", ids)
+            written += len(chunk_paths)
+            print(f"Lenteadas {written} imagens...")
+
+        params = np.array([image_size, lens_strength,
+                           image_size // 2 if center_x is None else center_x,
+                           image_size // 2 if center_y is None else center_y], dtype=np.float64)
+        _write_npz_entry(zf, 'lens_params', params)
+    return written
+
+
+def load_lensed_store(path):
+    """Lê um arquivo gerado por lens_image_files e retorna (imagens, ids)."""
+    with np.load(path) as store:
+        chunk_names = sorted(name for name in store.files if name.startswith('images_'))
+        if not chunk_names:
+            return np.empty((0,), dtype=np.uint8), np.empty((0,), dtype=str)
+        images = np.concatenate([store[name] for name in chunk_names])
+        ids = np.concatenate([store['ids_' + name.split('_')[1]] for name in chunk_names])
+    return images, ids
+
+
+def run(image_dir=IMAGE_DIR, output_path=OUTPUT_FILE, image_size=IMAGE_SIZE, lens_strength=LENS_STRENGTH,
+        chunk_size=CHUNK_SIZE, cache_dir=CACHE_DIR):
+    """Lenteia todas as imagens .jpg de `image_dir` e grava o resultado em `output_path`."""
+    if not os.path.isdir(image_dir):
+        raise FileNotFoundError(f"O diretório de imagens '{image_dir}' não foi encontrado.")
+
+    image_paths = sorted(glob.glob(os.path.join(image_dir, '*.jpg')))
+    if not image_paths:
+        raise FileNotFoundError(f"Nenhuma imagem .jpg encontrada na pasta '{image_dir}'.")
+
+    cache = DeflectionFieldCache(cache_dir=cache_dir)
+    total = lens_image_files(image_paths, output_path, image_size, lens_strength, chunk_size=chunk_size, cache=cache)
+    print(f"{total} imagens lenteadas gravadas em '{output_path}'.")
+    return total
@@ -0,0 +1,80 @@
+import numpy as np
+
+from .instrumentation import instrumented, stage
+from .lens_batch import compute_source_coords, lens_stack
+
+# --- Parâmetros ---
+IMAGE_SIZE = 256 # Tamanho da imagem (pixels x pixels)
+LENS_STRENGTH = 50 # Força da lente (valores maiores = mais distorção)
+BACKGROUND_IMAGE = 'background_galaxy.png' # Usada se existir; caso contrário, uma grade é gerada
+
+
+# --- 1. Criar ou Carregar Imagem de Fundo (Fonte) ---
+def create_grid_image(size):
+    img = np.zeros((size, size), dtype=np.uint8) # Fundo preto
+    # Adicionar linhas de grade
+    for i in range(0, size, size // 10):
+        img[i, :] = 255
+        img[:, i] = 255
+    # Adicionar um círculo no centro
+    center_x, center_y = size // 2, size // 2
+    radius = size // 8
+    Y, X = np.ogrid[:size, :size]
+    dist_from_center = np.sqrt((X - center_x)**2 + (Y - center_y)**2)
+    img[dist_from_center < radius] = 128 # Cor cinza para o círculo
+    return img
+
+
+def load_image(path, size):
+    from PIL import Image
+
+    try:
+        img_pil = Image.open(path).convert('L') # Abrir e converter para escala de cinza
+        img_pil = img_pil.resize((size, size)) # Redimensionar
+        return np.array(img_pil)
+    except FileNotFoundError:
+        print(f"Erro: Imagem '{path}' não encontrada. Gerando grade de exemplo.")
+        return create_grid_image(size)
+    except Exception as e:
+        print(f"Erro ao carregar imagem: {e}. Gerando grade de exemplo.")
+        return create_grid_image(size)
+
+
+# --- 2. Lenteamento de uma Imagem ---
+def lens_image(source_image, lens_strength=LENS_STRENGTH, center_x=None, center_y=None):
+    """Imagem lenteada (mapeamento inverso + interpolação bilinear, preto fora da fonte)."""
+    source_image = np.asarray(source_image)
+    with stage('index_build', rows=source_image.shape[0] * source_image.shape[1]):
+        coords = compute_source_coords(source_image.shape[:2], lens_strength, center_x, center_y)
+    with stage('transform', rows=1):
+        return lens_stack(source_image[np.newaxis], coords, order=1, cval=0)[0]
+
+
+@instrumented('render')
+def plot_lensing(source_image, lensed_image):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 5))
+
+    plt.subplot(1, 2, 1)
+    plt.title('Imagem Original (Fonte)')
+    plt.imshow(source_image, cmap='gray', origin='lower') # 'origin='lower'' para consistência se a imagem for cartesiana
+    plt.axis('off')
+
+    plt.subplot(1, 2, 2)
+    plt.title('Imagem Lenteada (Distorted)')
+    plt.imshow(lensed_image, cmap='gray', origin='lower')
+    plt.axis('off')
+
+    plt.tight_layout()
+    plt.show()
+
+
+def run(image_path=BACKGROUND_IMAGE, image_size=IMAGE_SIZE, lens_strength=LENS_STRENGTH, grid=False, show=True):
+    """Lenteia a imagem de fundo (ou uma grade de exemplo) e mostra o resultado."""
+    source_image = create_grid_image(image_size) if grid else load_image(image_path, image_size)
+    lensed_image = lens_image(source_image, lens_strength)
+    if show:
+        plot_lensing(source_image, lensed_image)
+    print("Simulação de lente gravitacional concluída.")
+    return lensed_image
@@ -0,0 +1,255 @@
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from .instrumentation import stage
+
+# --- Parâmetros ---
+BOX_SIZE = 500.0 # Lado da caixa simulada (Mpc)
+MESH_SIZE = 128 # Células por lado da malha do campo gaussiano
+NUM_PARTICLES = 10_000_000 # Número de partículas do catálogo sintético
+CHUNK_SIZE = 1_000_000 # Partículas geradas (e mantidas em memória) por bloco
+SPECTRAL_INDEX = -1.5 # Inclinação do espectro de potência P(k) ~ k^n
+SMOOTHING_SCALE = 5.0 # Escala de suavização gaussiana do campo (Mpc)
+SIGMA_DELTA = 1.0 # Desvio padrão do campo gaussiano (contraste de densidade)
+GROWTH = 1.0 # Amplitude do deslocamento de Zel'dovich (fator de crescimento)
+METHOD = 'lognormal' # 'lognormal' ou 'zeldovich'
+SEED = 42
+NUM_WORKERS = os.cpu_count() or 1
+OUTPUT_FILE = 'mock_catalog.npy'
+
+
+# --- 1. Gerador Simples (Blobs + Filamento), Pré-alocado e com Semente ---
+def generate_mock_cosmic_structure(num_points=10000, num_clusters=5, cluster_density_factor=5, seed=None):
+    """
+    Gera um conjunto de pontos 3D que simulam estruturas cósmicas.
+    Inclui um 'campo' de pontos aleatórios, alguns 'aglomerados' densos
+    e um filamento rudimentar. A saída é pré-alocada e o gerador é
+    reprodutível para uma mesma `seed`.
+    """
+    rng = np.random.default_rng(seed)
+    num_points_in_cluster = (num_points // (num_clusters * 2)) * cluster_density_factor
+    num_filament_points = 200
+    total = num_points + num_clusters * num_points_in_cluster + num_filament_points
+
+    data = np.empty((total, 3), dtype=np.float64)
+    data[:num_points] = rng.random((num_points, 3)) * 100 # Pontos aleatórios no cubo [0, 100]^3
+
+    # Aglomerados: pontos com distribuição gaussiana em torno de cada centro
+    cluster_centers = rng.random((num_clusters, 3)) * 100
+    start = num_points
+    for center in cluster_centers:
+        end = start + num_points_in_cluster
+        data[start:end] = rng.standard_normal((num_points_in_cluster, 3)) * 5 + center
+        start = end
+
+    # Filamento curvo com ruído
+    filament_length = 100
+    t = np.linspace(0, 1, num_filament_points)
+    filament = data[start:]
+    filament[:, 0] = t * filament_length
+    filament[:, 1] = np.sin(t * np.pi * 4) * 15 + (filament_length / 2)
+    filament[:, 2] = np.cos(t * np.pi * 2) * 10 + (filament_length / 2)
+    filament += rng.standard_normal((num_filament_points, 3)) * 2
+
+    print(f"Gerados {len(data)} pontos simulados.")
+    return data
+
+
+# --- 2. Campo Gaussiano Aleatório por FFT ---
+def power_spectrum(k, spectral_index=SPECTRAL_INDEX, smoothing_scale=SMOOTHING_SCALE):
+    """Espectro de potência em lei de potência com corte gaussiano (forma, sem normalização)."""
+    with np.errstate(divide='ignore'):
+        p = np.where(k > 0, k ** spectral_index, 0.0)
+    return p * np.exp(-(k * smoothing_scale) ** 2)
+
+
+def _wavenumbers(mesh_size, box_size):
+    k_full = 2 * np.pi * np.fft.fftfreq(mesh_size, d=box_size / mesh_size)
+    k_half = 2 * np.pi * np.fft.rfftfreq(mesh_size, d=box_size / mesh_size)
+    kx = k_full[:, np.newaxis, np.newaxis]
+    ky = k_full[np.newaxis, :, np.newaxis]
+    kz = k_half[np.newaxis, np.newaxis, :]
+    return kx, ky, kz
+
+
+def gaussian_random_field_k(mesh_size=MESH_SIZE, box_size=BOX_SIZE, sigma=SIGMA_DELTA, seed=SEED,
+                            spectral_index=SPECTRAL_INDEX, smoothing_scale=SMOOTHING_SCALE):
+    """
+    Campo gaussiano no espaço de Fourier (rfft 3D), normalizado para que o
+    campo no espaço real tenha desvio padrão `sigma`.
+    """
+    rng = np.random.default_rng(seed)
+    kx, ky, kz = _wavenumbers(mesh_size, box_size)
+    k = np.sqrt(kx**2 + ky**2 + kz**2)
+
+    # Ruído branco no espaço real -> hermitianidade garantida pela rfft
+    white = rng.standard_normal((mesh_size, mesh_size, mesh_size))
+    delta_k = np.fft.rfftn(white) * np.sqrt(power_spectrum(k, spectral_index, smoothing_scale))
+    delta_k[0, 0, 0] = 0
+
+    std = np.fft.irfftn(delta_k, s=(mesh_size,) * 3).std()
+    if std > 0:
+        delta_k *= sigma / std
+    return delta_k
+
+
+def lognormal_density(delta_k, mesh_size=MESH_SIZE):
+    """Densidade lognormal 1 + delta_LN = exp(delta - sigma^2/2), com média 1."""
+    delta = np.fft.irfftn(delta_k, s=(mesh_size,) * 3)
+    density = np.exp(delta - delta.var() / 2)
+    return density / density.mean()
+
+
+def zeldovich_displacement(delta_k, mesh_size=MESH_SIZE, box_size=BOX_SIZE):
+    """Campo de deslocamento psi = -grad(phi), com laplaciano(phi) = delta (malha (3, N, N, N))."""
+    kx, ky, kz = _wavenumbers(mesh_size, box_size)
+    k2 = kx**2 + ky**2 + kz**2
+    k2[0, 0, 0] = 1 # delta_k[0, 0, 0] = 0, então o modo zero continua nulo
+    psi = np.empty((3, mesh_size, mesh_size, mesh_size), dtype=np.float32)
+    for axis, k_axis in enumerate((kx, ky, kz)):
+        psi[axis] = np.fft.irfftn(1j * k_axis / k2 * delta_k, s=(mesh_size,) * 3)
+    return psi
+
+
+def _trilinear(mesh, positions, box_size):
+    """Interpolação trilinear periódica (CIC) de uma malha (N, N, N) nas posições (M, 3)."""
+    n = mesh.shape[0]
+    cell = positions * (n / box_size) - 0.5
+    base = np.floor(cell).astype(np.int64)
+    frac = cell - base
+    out = np.zeros(len(positions), dtype=np.float64)
+    for dx in (0, 1):
+        wx = frac[:, 0] if dx else 1 - frac[:, 0]
+        ix = (base[:, 0] + dx) % n
+        for dy in (0, 1):
+            wy = frac[:, 1] if dy else 1 - frac[:, 1]
+            iy = (base[:, 1] + dy) % n
+            for dz in (0, 1):
+                wz = frac[:, 2] if dz else 1 - frac[:, 2]
+                iz = (base[:, 2] + dz) % n
+                out += wx * wy * wz * mesh[ix, iy, iz]
+    return out
+
+
+# --- 3. Geração de Partículas em Blocos ---
+def lognormal_chunk(cell_ids, cell_counts, mesh_size, box_size, seed):
+    """Partículas distribuídas uniformemente dentro das células, com `cell_counts` por célula."""
+    rng = np.random.default_rng(seed)
+    cell_size = box_size / mesh_size
+    ids = np.repeat(cell_ids, cell_counts)
+    ix, rest = np.divmod(ids, mesh_size * mesh_size)
+    iy, iz = np.divmod(rest, mesh_size)
+    corner = np.stack([ix, iy, iz], axis=1).astype(np.float64) * cell_size
+    return (corner + rng.random((len(ids), 3)) * cell_size).astype(np.float32)
+
+
+def zeldovich_chunk(psi, num_particles, box_size, growth, seed):
+    """Posições lagrangianas uniformes deslocadas por growth * psi (condições periódicas)."""
+    rng = np.random.default_rng(seed)
+    q = rng.random((num_particles, 3)) * box_size
+    x = np.empty_like(q)
+    for axis in range(3):
+        x[:, axis] = q[:, axis] + growth * _trilinear(psi[axis], q, box_size)
+    return np.mod(x, box_size).astype(np.float32)
+
+
+_worker_state = {}
+
+
+def _init_worker(output_path, field, config):
+    _worker_state['output'] = np.load(output_path, mmap_mode='r+')
+    _worker_state['field'] = field
+    _worker_state['config'] = config
+
+
+def _write_chunk(task):
+    offset, size, seed, payload = task
+    config = _worker_state['config']
+    if config['method'] == 'lognormal':
+        cell_start, cell_end = payload
+        counts = _worker_state['field']
+        cell_ids = np.arange(cell_start, cell_end)
+        chunk = lognormal_chunk(cell_ids, counts[cell_start:cell_end], config['mesh_size'], config['box_size'], seed)
+    else:
+        chunk = zeldovich_chunk(_worker_state['field'], size, config['box_size'], config['growth'], seed)
+    output = _worker_state['output']
+    output[offset:offset + size] = chunk
+    output.flush()
+    return size
+
+
+def _lognormal_tasks(counts, chunk_size, child_seeds):
+    # Cortar a lista de células em blocos de ~chunk_size partículas
+    cumulative = np.cumsum(counts)
+    targets = np.arange(chunk_size, cumulative[-1], chunk_size)
+    cuts = np.concatenate(([0], np.searchsorted(cumulative, targets, side='right'), [len(counts)]))
+    cuts = np.unique(cuts)
+    tasks = []
+    for index, (cell_start, cell_end) in enumerate(zip(cuts[:-1], cuts[1:])):
+        offset = int(cumulative[cell_start - 1]) if cell_start > 0 else 0
+        size = int(cumulative[cell_end - 1]) - offset
+        tasks.append((offset, size, child_seeds[index], (int(cell_start), int(cell_end))))
+    return tasks
+
+
+def stream_mock_catalog(output_path=OUTPUT_FILE, num_particles=NUM_PARTICLES, method=METHOD, box_size=BOX_SIZE,
+                        mesh_size=MESH_SIZE, sigma=SIGMA_DELTA, growth=GROWTH, spectral_index=SPECTRAL_INDEX,
+                        smoothing_scale=SMOOTHING_SCALE, chunk_size=CHUNK_SIZE, seed=SEED, num_workers=NUM_WORKERS):
+    """
+    Gera um catálogo sintético de `num_particles` posições (float32, Mpc)
+    com estrutura de campo gaussiano (lognormal ou Zel'dovich) e grava-o
+    diretamente em um .npy, bloco a bloco, em paralelo.
+    O resultado depende apenas da semente e dos parâmetros, não do número
+    de processos. Retorna o caminho do arquivo gerado.
+    """
+    if method not in ('lognormal', 'zeldovich'):
+        raise ValueError(f"Método desconhecido: {method!r} (use 'lognormal' ou 'zeldovich').")
+
+    start = time.perf_counter()
+    seed_sequence = np.random.SeedSequence(seed)
+    field_seed, sample_seed, chunk_seed = seed_sequence.spawn(3)
+    with stage('transform', rows=mesh_size**3, method=method):
+        delta_k = gaussian_random_field_k(mesh_size, box_size, sigma, field_seed, spectral_index, smoothing_scale)
+
+        if method == 'lognormal':
+            density = lognormal_density(delta_k, mesh_size).ravel()
+            # Multinomial: total exato de partículas, distribuído conforme a densidade
+            counts = np.random.default_rng(sample_seed).multinomial(num_particles, density / density.sum())
+            field = counts
+            num_tasks = int(np.ceil(num_particles / chunk_size)) + 1
+            tasks = _lognormal_tasks(counts, chunk_size, chunk_seed.spawn(num_tasks))
+        else:
+            field = zeldovich_displacement(delta_k, mesh_size, box_size)
+            offsets = range(0, num_particles, chunk_size)
+            child_seeds = chunk_seed.spawn(len(offsets))
+            tasks = [(offset, min(chunk_size, num_particles - offset), child_seeds[index], None)
+                     for index, offset in enumerate(offsets)]
+        del delta_k
+
+    print(f"Campo gaussiano ({mesh_size}^3) gerado em {time.perf_counter() - start:.1f} s. "
+          f"Gravando {num_particles} partículas em {len(tasks)} blocos...")
+
+    config = dict(method=method, mesh_size=mesh_size, box_size=box_size, growth=growth)
+    num_workers = max(1, min(num_workers, len(tasks)))
+    with stage('export', rows=num_particles, workers=num_workers):
+        # Pré-alocar o arquivo de saída; cada bloco escreve na sua própria faixa de linhas
+        output = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float32, shape=(num_particles, 3))
+        del output
+
+        if num_workers == 1:
+            _init_worker(output_path, field, config)
+            written = sum(_write_chunk(task) for task in tasks)
+            _worker_state.clear()
+        else:
+            with Pool(num_workers, initializer=_init_worker, initargs=(output_path, field, config)) as pool:
+                written = 0
+                for size in pool.imap_unordered(_write_chunk, tasks):
+                    written += size
+                    print(f"Gravadas {written} partículas...")
+
+    print(f"Catálogo sintético com {written} partículas gravado em '{output_path}' "
+          f"({time.perf_counter() - start:.1f} s).")
+    return output_path
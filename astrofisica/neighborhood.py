@@ -0,0 +1,92 @@
+import numpy as np
+
+from . import catalog
+from .instrumentation import instrumented, stage
+
+# --- Parâmetros ---
+# Raio para buscar vizinhos (em Mpc). Um raio típico para aglomerados é ~1 Mpc
+SEARCH_RADIUS_MPC = 1.0
+
+
+def count_neighbors(coords, radius=SEARCH_RADIUS_MPC, tree=None):
+    """
+    Número de outros objetos dentro de `radius` de cada ponto (sem contar
+    o próprio). Uma única consulta vetorizada na KDTree, em paralelo.
+    """
+    from scipy.spatial import KDTree
+
+    if tree is None:
+        print("Construindo KDTree...")
+        with stage('index_build', rows=len(coords)):
+            tree = KDTree(coords)
+        print("KDTree construída.")
+    with stage('query', rows=len(coords)):
+        counts = tree.query_ball_point(coords, radius, return_length=True, workers=-1)
+    return np.asarray(counts, dtype=np.int64) - 1 # Subtrair 1 para não contar a própria galáxia
+
+
+def load_neighborhood_catalog(csv_path=catalog.CSV_FILE):
+    df = catalog.load_sdss_catalog(csv_path, required_cols=['ra', 'dec', 'redshift', 'g', 'r'],
+                                   dropna_cols=['redshift', 'g', 'r'])
+    df['g_r_color'] = df['g'] - df['r']
+    return catalog.add_cartesian_coords(df)
+
+
+@instrumented('render')
+def plot_neighborhood(df, radius=SEARCH_RADIUS_MPC):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(15, 6))
+
+    # Gráfico 1: Histograma da Densidade de Vizinhança
+    plt.subplot(1, 2, 1)
+    bins = np.arange(df['n_neighbors'].min(), df['n_neighbors'].max() + 2) - 0.5
+    sns.histplot(df['n_neighbors'], bins=bins, kde=False)
+    plt.title('Distribuição do Número de Vizinhos')
+    plt.xlabel(f'Número de Vizinhos dentro de {radius} Mpc')
+    plt.ylabel('Frequência')
+    plt.xticks(np.arange(df['n_neighbors'].min(), df['n_neighbors'].max() + 1, 5))
+
+    # Gráfico 2: Cor da Galáxia vs. Número de Vizinhos (scatter plot)
+    plt.subplot(1, 2, 2)
+    sns.scatterplot(x='n_neighbors', y='g_r_color', data=df, alpha=0.3, s=10)
+    plt.title('Cor da Galáxia vs. Número de Vizinhos')
+    plt.xlabel(f'Número de Vizinhos dentro de {radius} Mpc')
+    plt.ylabel('Cor (g-r)')
+    plt.grid(True)
+    plt.xticks(np.arange(df['n_neighbors'].min(), df['n_neighbors'].max() + 1, 5))
+
+    plt.tight_layout()
+    plt.show()
+
+
+@instrumented('render')
+def plot_neighborhood_3d(df, radius=SEARCH_RADIUS_MPC):
+    import plotly.express as px
+
+    print("Gerando visualização 3D de galáxias coloridas por densidade de vizinhança...")
+    fig_3d = px.scatter_3d(df, x='x', y='y', z='z_cartesian',
+                           color='n_neighbors',
+                           size_max=2, opacity=0.7,
+                           title=f'Galáxias do SDSS coloridas pelo Nº de Vizinhos ({radius} Mpc)',
+                           labels={'x': 'X (Mpc)', 'y': 'Y (Mpc)', 'z_cartesian': 'Z (Mpc)'},
+                           color_continuous_scale=px.colors.sequential.Plasma)
+    fig_3d.update_traces(marker=dict(size=1))
+    fig_3d.show()
+
+
+def run(csv_path=catalog.CSV_FILE, radius=SEARCH_RADIUS_MPC, show=True):
+    """Calcula a densidade de vizinhança de cada galáxia e a relação cor-densidade."""
+    df = load_neighborhood_catalog(csv_path)
+
+    print(f"Calculando número de vizinhos dentro de {radius} Mpc para cada galáxia...")
+    df['n_neighbors'] = count_neighbors(catalog.cartesian_coords(df), radius)
+    print("Cálculo de vizinhança concluído.")
+    print(df.head())
+
+    if show:
+        plot_neighborhood(df, radius)
+        plot_neighborhood_3d(df, radius)
+    print("Análise de vizinhança concluída com dados do SDSS.")
+    return df
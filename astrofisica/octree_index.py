@@ -0,0 +1,207 @@
+import numpy as np
+
+# --- Parâmetros ---
+MAX_DEPTH = 21 # Bits por eixo do código de Morton (3 * 21 = 63 bits)
+LEAF_SIZE = 64 # Nós com até esse número de pontos são testados ponto a ponto
+
+
+# --- 1. Códigos de Morton (Ordem Z) ---
+def _spread_bits(v):
+    """Intercala dois zeros entre cada bit de um inteiro de 21 bits."""
+    v = v.astype(np.uint64) & np.uint64(0x1FFFFF)
+    v = (v | (v << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return v
+
+
+def morton_codes(cells):
+    """Código de Morton de células inteiras (N, 3); x ocupa o bit mais alto de cada dígito octal."""
+    return (_spread_bits(cells[:, 0]) << np.uint64(2)) | (_spread_bits(cells[:, 1]) << np.uint64(1)) \
+        | _spread_bits(cells[:, 2])
+
+
+# --- 2. Octree Linear ---
+class PointOctree:
+    """
+    Índice octree linear sobre uma nuvem de pontos 3D, construído uma vez.
+    Os pontos são ordenados pelo código de Morton, de modo que cada nó da
+    octree corresponde a um intervalo contíguo do array ordenado.
+    Responde consultas por caixa e por esfera e fornece subconjuntos do
+    mais grosso ao mais fino para um orçamento de pontos (nível de detalhe).
+    Todos os índices retornados referem-se ao array de pontos original.
+    """
+
+    def __init__(self, points, leaf_size=LEAF_SIZE, max_depth=MAX_DEPTH):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.points = points
+        self.leaf_size = leaf_size
+        self.max_depth = max_depth
+
+        # Limites calculados uma única vez (também usados para os eixos dos gráficos);
+        # sem pontos, a caixa é degenerada na origem e todas as consultas retornam vazio
+        self.lower = points.min(axis=0) if len(points) else np.zeros(3)
+        self.upper = points.max(axis=0) if len(points) else np.zeros(3)
+        extent = max((self.upper - self.lower).max(), 1e-12)
+        self.cell_scale = ((1 << max_depth) - 1) / extent # Células cúbicas
+        self.root_size = (1 << max_depth) / self.cell_scale
+
+        cells = np.floor((points - self.lower) * self.cell_scale).astype(np.int64)
+        codes = morton_codes(cells)
+        self.order = np.argsort(codes, kind='stable')
+        self.codes = codes[self.order]
+        self.sorted_points = points[self.order]
+        self.levels = self._detail_levels()
+
+    def _detail_levels(self):
+        """
+        Profundidade a partir da qual cada ponto (ordenado) é o primeiro do
+        seu nó. Pegar os pontos com nível <= d dá um representante por nó
+        ocupado na profundidade d; os conjuntos são aninhados (grosso -> fino).
+        """
+        levels = np.full(len(self.codes), self.max_depth + 1, dtype=np.int64)
+        if len(self.codes) == 0:
+            return levels
+        levels[0] = 0
+        diff = self.codes[1:] ^ self.codes[:-1]
+        nonzero = diff != 0
+        highest_bit = np.zeros(len(diff), dtype=np.int64)
+        # Bit mais alto diferente -> dígito octal (profundidade) em que os nós se separam
+        values = diff[nonzero]
+        bits = np.floor(np.log2(values.astype(np.float64))).astype(np.int64)
+        bits -= (np.uint64(1) << bits.astype(np.uint64)) > values # Corrige arredondamento do float64
+        highest_bit[nonzero] = bits
+        levels[1:][nonzero] = self.max_depth - highest_bit[nonzero] // 3
+        return levels
+
+    @property
+    def bounds(self):
+        return self.lower, self.upper
+
+    def cube_limits(self):
+        """Limites (mín, máx) de um cubo centrado nos dados, para manter proporções nos eixos."""
+        mid = (self.lower + self.upper) * 0.5
+        half = (self.upper - self.lower).max() / 2.0
+        return [(m - half, m + half) for m in mid]
+
+    def _node_range(self, prefix, depth):
+        shift = np.uint64(3 * (self.max_depth - depth))
+        start = np.searchsorted(self.codes, np.uint64(prefix) << shift, side='left')
+        end = np.searchsorted(self.codes, np.uint64(prefix + 1) << shift, side='left')
+        return start, end
+
+    def _node_box(self, cell, depth):
+        size = self.root_size / (1 << depth)
+        lo = self.lower + np.asarray(cell, dtype=np.float64) * size
+        return lo, lo + size
+
+    def _query(self, classify_box, test_points):
+        """
+        Percorre a octree. `classify_box(lo, hi)` retorna 0 (disjunto),
+        1 (parcial) ou 2 (contido); `test_points(pts)` retorna a máscara
+        dos pontos dentro da região.
+        """
+        ranges = []
+        partial = []
+        stack = [(0, 0, (0, 0, 0))]
+        while stack:
+            prefix, depth, cell = stack.pop()
+            start, end = self._node_range(prefix, depth)
+            if start == end:
+                continue
+            lo, hi = self._node_box(cell, depth)
+            status = classify_box(lo, hi)
+            if status == 0:
+                continue
+            if status == 2:
+                ranges.append(np.arange(start, end))
+            elif end - start <= self.leaf_size or depth == self.max_depth:
+                mask = test_points(self.sorted_points[start:end])
+                partial.append(np.flatnonzero(mask) + start)
+            else:
+                for k in range(8):
+                    child = (2 * cell[0] + ((k >> 2) & 1), 2 * cell[1] + ((k >> 1) & 1), 2 * cell[2] + (k & 1))
+                    stack.append((prefix * 8 + k, depth + 1, child))
+
+        pieces = ranges + partial
+        if not pieces:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(pieces))
+
+    # --- 3. Consultas por Região ---
+    def query_box_sorted(self, box_min, box_max):
+        """Posições (no array ordenado) dos pontos dentro da caixa [box_min, box_max]."""
+        box_min = np.asarray(box_min, dtype=np.float64)
+        box_max = np.asarray(box_max, dtype=np.float64)
+
+        def classify_box(lo, hi):
+            if np.any(hi < box_min) or np.any(lo > box_max):
+                return 0
+            if np.all(lo >= box_min) and np.all(hi <= box_max):
+                return 2
+            return 1
+
+        def test_points(pts):
+            return np.all((pts >= box_min) & (pts <= box_max), axis=1)
+
+        return self._query(classify_box, test_points)
+
+    def query_sphere_sorted(self, center, radius):
+        """Posições (no array ordenado) dos pontos dentro da esfera."""
+        center = np.asarray(center, dtype=np.float64)
+        radius2 = float(radius) ** 2
+
+        def classify_box(lo, hi):
+            nearest = np.clip(center, lo, hi)
+            if np.sum((nearest - center) ** 2) > radius2:
+                return 0
+            farthest = np.where(np.abs(lo - center) > np.abs(hi - center), lo, hi)
+            if np.sum((farthest - center) ** 2) <= radius2:
+                return 2
+            return 1
+
+        def test_points(pts):
+            return np.sum((pts - center) ** 2, axis=1) <= radius2
+
+        return self._query(classify_box, test_points)
+
+    def query_box(self, box_min, box_max):
+        """Índices (no array original) dos pontos dentro da caixa alinhada aos eixos."""
+        return np.sort(self.order[self.query_box_sorted(box_min, box_max)])
+
+    def query_sphere(self, center, radius):
+        """Índices (no array original) dos pontos dentro da esfera."""
+        return np.sort(self.order[self.query_sphere_sorted(center, radius)])
+
+    # --- 4. Nível de Detalhe (Grosso -> Fino) ---
+    def sample(self, budget, box_min=None, box_max=None, seed=0):
+        """
+        Até `budget` índices de pontos (no array original) distribuídos do
+        mais grosso ao mais fino na região visível (caixa opcional): todos os
+        representantes das profundidades mais rasas que cabem no orçamento
+        e, no último nível, uma amostra aleatória reprodutível.
+        """
+        if box_min is None and box_max is None:
+            candidates = np.arange(len(self.codes))
+        else:
+            box_min = self.lower if box_min is None else box_min
+            box_max = self.upper if box_max is None else box_max
+            candidates = self.query_box_sorted(box_min, box_max)
+
+        if len(candidates) <= budget:
+            return np.sort(self.order[candidates])
+
+        levels = self.levels[candidates]
+        counts = np.cumsum(np.bincount(levels, minlength=self.max_depth + 2))
+        full_level = np.searchsorted(counts, budget, side='right') - 1 # Último nível que cabe inteiro
+
+        keep = levels <= full_level
+        chosen = candidates[keep]
+        remaining = budget - len(chosen)
+        if remaining > 0:
+            next_level = candidates[levels == full_level + 1]
+            rng = np.random.default_rng(seed)
+            chosen = np.concatenate([chosen, rng.choice(next_level, remaining, replace=False)])
+        return np.sort(self.order[chosen])
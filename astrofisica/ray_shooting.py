@@ -0,0 +1,327 @@
+import os
+import time
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from .instrumentation import instrumented, stage
+
+# --- Parâmetros ---
+# Todas as distâncias estão em unidades do raio de Einstein de uma massa unitária.
+KAPPA_STAR = 0.4 # Convergência em estrelas (densidade superficial de massa compacta)
+SHEAR = 0.0 # Cisalhamento externo (gamma)
+SMOOTH_KAPPA = 0.0 # Convergência de matéria suave (kappa_c)
+SOURCE_HALF_SIZE = 10.0 # Meia-largura da região do mapa no plano da fonte
+MAP_PIXELS = 1000 # Resolução do mapa de magnificação (pixels x pixels)
+RAYS_PER_SIDE = 10000 # Raios por lado no plano da imagem (10000^2 = 10^8 raios)
+TILE_RAYS = 256 # Raios por lado em cada bloco (memória limitada por bloco)
+MULTIPOLE_ORDER = 8 # Ordem da expansão em multipolos das células distantes
+TAYLOR_ORDER = 8 # Ordem da expansão de Taylor do campo distante em cada bloco
+OPENING_FACTOR = 2.5 # Células mais distantes que isso (em raios) usam a aproximação
+NUM_WORKERS = os.cpu_count() or 1
+OUTPUT_FILE = 'magnification_map.npy'
+
+
+# --- 1. Campo de Lentes Pontuais ---
+def random_point_lenses(kappa_star, half_size, mass=1.0, seed=None):
+    """
+    Distribui lentes pontuais uniformemente em um disco de raio `half_size`
+    com a densidade que produz a convergência `kappa_star`.
+    Retorna (posições complexas, massas).
+    """
+    rng = np.random.default_rng(seed)
+    num_lenses = int(round(kappa_star * half_size**2 / mass))
+    radius = half_size * np.sqrt(rng.random(num_lenses))
+    angle = 2 * np.pi * rng.random(num_lenses)
+    positions = radius * np.exp(1j * angle)
+    masses = np.full(num_lenses, mass, dtype=np.float64)
+    return positions, masses
+
+
+def estimate_kappa_star(positions, masses):
+    """
+    Convergência em estrelas de um campo gerado como em random_point_lenses
+    (N = kappa * R**2 / m, com R estimado pela lente mais distante).
+    """
+    positions = np.asarray(positions, dtype=np.complex128)
+    if len(positions) == 0:
+        return 0.0
+    return float(np.sum(masses) / np.abs(positions).max()**2)
+
+
+def shooting_region(source_half_size, kappa_star, shear=SHEAR, smooth_kappa=SMOOTH_KAPPA, margin=1.5):
+    """
+    Meia-largura da região de raios no plano da imagem que cobre o mapa
+    da fonte (mapeamento macro (1 - kappa -/+ gamma), com margem extra).
+    """
+    kappa = kappa_star + smooth_kappa
+    scale = min(abs(1 - kappa - shear), abs(1 - kappa + shear))
+    return margin * source_half_size / max(scale, 0.1)
+
+
+def direct_deflection(z, positions, masses):
+    """Soma direta da deflexão (complexa) de todas as lentes em cada raio z."""
+    f = np.zeros_like(z)
+    for position, mass in zip(positions, masses):
+        f += mass / (z - position)
+    return np.conj(f)
+
+
+# --- 2. Aproximação de Campo Distante em Grade (Multipolos + Taylor) ---
+class LensGrid:
+    """
+    Agrupa as lentes em células de uma grade regular e guarda, para cada
+    célula não vazia, o centro de massa e os momentos multipolares
+    Q_k = sum m_i (z_i - c)^k. O campo das células distantes é somado
+    como série de multipolos e expandido em Taylor em torno do centro de
+    cada bloco de raios, evitando o custo O(N_raios x N_lentes).
+    """
+
+    def __init__(self, positions, masses, cell_size, multipole_order=MULTIPOLE_ORDER):
+        self.positions = np.asarray(positions, dtype=np.complex128)
+        self.masses = np.asarray(masses, dtype=np.float64)
+        self.cell_size = float(cell_size)
+        self.multipole_order = multipole_order
+
+        if len(self.positions) == 0:
+            self.cell_keys = np.empty((0, 2), dtype=np.int64)
+            self.cell_starts = np.zeros(1, dtype=np.int64)
+            self.centers = np.empty(0, dtype=np.complex128)
+            self.moments = np.empty((0, multipole_order + 1), dtype=np.complex128)
+            self.radii = np.empty(0)
+            self.order = np.empty(0, dtype=np.int64)
+            return
+
+        ix = np.floor(self.positions.real / self.cell_size).astype(np.int64)
+        iy = np.floor(self.positions.imag / self.cell_size).astype(np.int64)
+
+        # Ordenar as lentes por célula para que cada célula seja um intervalo contíguo
+        self.order = np.lexsort((iy, ix))
+        ix, iy = ix[self.order], iy[self.order]
+        self.positions = self.positions[self.order]
+        self.masses = self.masses[self.order]
+
+        boundaries = np.flatnonzero((np.diff(ix) != 0) | (np.diff(iy) != 0)) + 1
+        self.cell_starts = np.concatenate(([0], boundaries, [len(ix)]))
+        self.cell_keys = np.stack([ix[self.cell_starts[:-1]], iy[self.cell_starts[:-1]]], axis=1)
+
+        cell_index = np.repeat(np.arange(len(self.cell_keys)), np.diff(self.cell_starts))
+        total_mass = np.bincount(cell_index, weights=self.masses)
+        center_real = np.bincount(cell_index, weights=self.masses * self.positions.real) / total_mass
+        center_imag = np.bincount(cell_index, weights=self.masses * self.positions.imag) / total_mass
+        self.centers = center_real + 1j * center_imag
+
+        offsets = self.positions - self.centers[cell_index]
+        self.radii = np.zeros(len(self.cell_keys))
+        np.maximum.at(self.radii, cell_index, np.abs(offsets))
+
+        self.moments = np.zeros((len(self.cell_keys), multipole_order + 1), dtype=np.complex128)
+        power = self.masses.astype(np.complex128)
+        for k in range(multipole_order + 1):
+            self.moments[:, k] = np.bincount(cell_index, weights=power.real, minlength=len(self.cell_keys)) \
+                + 1j * np.bincount(cell_index, weights=power.imag, minlength=len(self.cell_keys))
+            power = power * offsets
+
+    def split_cells(self, tile_center, tile_radius, opening_factor=OPENING_FACTOR):
+        """Separa as células em próximas (soma direta) e distantes (aproximação)."""
+        distance = np.abs(self.centers - tile_center)
+        far = distance > opening_factor * (tile_radius + self.radii)
+        return np.flatnonzero(~far), np.flatnonzero(far)
+
+    def near_lenses(self, cells):
+        """Posições e massas das lentes pertencentes às células dadas."""
+        if len(cells) == 0:
+            return np.empty(0, dtype=np.complex128), np.empty(0)
+        index = np.concatenate([np.arange(self.cell_starts[c], self.cell_starts[c + 1]) for c in cells])
+        return self.positions[index], self.masses[index]
+
+    def far_field_taylor(self, cells, tile_center, taylor_order=TAYLOR_ORDER):
+        """
+        Coeficientes a_n da expansão f_far(t + u) = sum_n a_n u^n, onde
+        f = sum m / (z - z_i) e a deflexão é conj(f).
+        """
+        coefficients = np.zeros(taylor_order + 1, dtype=np.complex128)
+        if len(cells) == 0:
+            return coefficients
+        w = tile_center - self.centers[cells]
+        inv_w = 1.0 / w
+        moments = self.moments[cells]
+        # d^n/du^n de (w + u)^-(k+1) / n! = (-1)^n C(k+n, n) w^-(k+1+n)
+        inv_w_power = inv_w.copy() # w^-(k+1) para k = 0
+        for k in range(self.multipole_order + 1):
+            term = moments[:, k] * inv_w_power
+            binom = 1.0
+            for n in range(taylor_order + 1):
+                if n > 0:
+                    term = term * inv_w
+                    binom *= (k + n) / n
+                coefficients[n] += ((-1) ** n) * binom * term.sum()
+            inv_w_power = inv_w_power * inv_w
+        return coefficients
+
+
+# --- 3. Disparo de Raios em Blocos ---
+def shoot_tile(grid, z, tile_center, tile_radius, shear=SHEAR, smooth_kappa=SMOOTH_KAPPA,
+               opening_factor=OPENING_FACTOR, taylor_order=TAYLOR_ORDER):
+    """Posições no plano da fonte para um bloco de raios z (complexos) no plano da imagem."""
+    near_cells, far_cells = grid.split_cells(tile_center, tile_radius, opening_factor)
+
+    # Campo distante: avaliação do polinômio de Taylor (Horner)
+    coefficients = grid.far_field_taylor(far_cells, tile_center, taylor_order)
+    u = z - tile_center
+    f = np.full_like(z, coefficients[-1])
+    for a in coefficients[-2::-1]:
+        f = f * u + a
+
+    # Campo próximo: soma direta
+    positions, masses = grid.near_lenses(near_cells)
+    for position, mass in zip(positions, masses):
+        f += mass / (z - position)
+
+    alpha = np.conj(f)
+    y_real = (1 - smooth_kappa - shear) * z.real - alpha.real
+    y_imag = (1 - smooth_kappa + shear) * z.imag - alpha.imag
+    return y_real, y_imag
+
+
+def bin_rays(counts, y_real, y_imag, source_half_size, map_pixels):
+    """Acumula as posições da fonte em `counts` (map_pixels x map_pixels, achatado)."""
+    scale = map_pixels / (2 * source_half_size)
+    col = np.floor((y_real + source_half_size) * scale).astype(np.int64)
+    row = np.floor((y_imag + source_half_size) * scale).astype(np.int64)
+    inside = (col >= 0) & (col < map_pixels) & (row >= 0) & (row < map_pixels)
+    counts += np.bincount(row[inside] * map_pixels + col[inside], minlength=map_pixels * map_pixels).astype(counts.dtype)
+
+
+def _tile_layout(rays_per_side, tile_rays):
+    starts = range(0, rays_per_side, tile_rays)
+    return [(r, c) for r in starts for c in starts]
+
+
+def _shoot_tiles(grid, tiles, counts, config):
+    rays_per_side = config['rays_per_side']
+    tile_rays = config['tile_rays']
+    half = config['image_half_size']
+    dx = 2 * half / rays_per_side
+    axis = -half + (np.arange(rays_per_side) + 0.5) * dx
+
+    for row_start, col_start in tiles:
+        ys = axis[row_start:row_start + tile_rays]
+        xs = axis[col_start:col_start + tile_rays]
+        z = xs[np.newaxis, :] + 1j * ys[:, np.newaxis]
+        tile_center = 0.5 * (xs[0] + xs[-1]) + 0.5j * (ys[0] + ys[-1])
+        tile_radius = 0.5 * np.hypot(xs[-1] - xs[0], ys[-1] - ys[0])
+
+        y_real, y_imag = shoot_tile(grid, z, tile_center, tile_radius, config['shear'], config['smooth_kappa'],
+                                    config['opening_factor'], config['taylor_order'])
+        bin_rays(counts, y_real.ravel(), y_imag.ravel(), config['source_half_size'], config['map_pixels'])
+
+
+# --- 4. Acumulação Multiprocesso em Histograma Compartilhado ---
+_worker_state = {}
+
+
+def _init_worker(grid, config, shm_name, shape):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_state['shm'] = shm # Manter referência viva enquanto o processo existir
+    _worker_state['grid'] = grid
+    _worker_state['config'] = config
+    _worker_state['counts'] = np.ndarray(shape, dtype=np.uint32, buffer=shm.buf)
+
+
+def _worker_run(args):
+    worker_index, tiles = args
+    # Cada processo escreve apenas no seu próprio plano do histograma (sem travas)
+    counts = _worker_state['counts'][worker_index].reshape(-1)
+    _shoot_tiles(_worker_state['grid'], tiles, counts, _worker_state['config'])
+    return len(tiles)
+
+
+def magnification_map(positions, masses, source_half_size=SOURCE_HALF_SIZE, map_pixels=MAP_PIXELS,
+                      rays_per_side=RAYS_PER_SIDE, image_half_size=None, shear=SHEAR, smooth_kappa=SMOOTH_KAPPA,
+                      tile_rays=TILE_RAYS, cell_size=None, multipole_order=MULTIPOLE_ORDER,
+                      taylor_order=TAYLOR_ORDER, opening_factor=OPENING_FACTOR, num_workers=NUM_WORKERS):
+    """
+    Gera o mapa de magnificação por disparo inverso de raios através de um
+    plano de lentes pontuais. Retorna (mapa de magnificação, contagem de raios).
+    """
+    positions = np.asarray(positions, dtype=np.complex128)
+    masses = np.asarray(masses, dtype=np.float64)
+    if image_half_size is None:
+        image_half_size = shooting_region(source_half_size, estimate_kappa_star(positions, masses), shear,
+                                          smooth_kappa)
+
+    dx = 2 * image_half_size / rays_per_side
+    if cell_size is None:
+        cell_size = tile_rays * dx # Células do tamanho de um bloco de raios
+    with stage('index_build', rows=len(positions)):
+        grid = LensGrid(positions, masses, cell_size, multipole_order)
+
+    config = dict(rays_per_side=rays_per_side, tile_rays=tile_rays, image_half_size=image_half_size,
+                  source_half_size=source_half_size, map_pixels=map_pixels, shear=shear,
+                  smooth_kappa=smooth_kappa, opening_factor=opening_factor, taylor_order=taylor_order)
+    tiles = _tile_layout(rays_per_side, tile_rays)
+    num_workers = max(1, min(num_workers, len(tiles)))
+
+    print(f"Disparando {rays_per_side**2} raios em {len(tiles)} blocos através de {len(positions)} lentes "
+          f"({len(grid.cell_keys)} células, {num_workers} processos)...")
+    start = time.perf_counter()
+
+    with stage('query', rows=rays_per_side**2, workers=num_workers):
+        if num_workers == 1:
+            counts = np.zeros(map_pixels * map_pixels, dtype=np.uint32)
+            _shoot_tiles(grid, tiles, counts, config)
+            counts = counts.reshape(map_pixels, map_pixels).astype(np.uint64) # Mesmo tipo do caso paralelo
+        else:
+            shape = (num_workers, map_pixels, map_pixels)
+            shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(np.uint32).itemsize)
+            try:
+                shared_counts = np.ndarray(shape, dtype=np.uint32, buffer=shm.buf)
+                shared_counts[:] = 0
+                tasks = [(w, tiles[w::num_workers]) for w in range(num_workers)]
+                with Pool(num_workers, initializer=_init_worker, initargs=(grid, config, shm.name, shape)) as pool:
+                    pool.map(_worker_run, tasks)
+                counts = shared_counts.sum(axis=0, dtype=np.uint64)
+                del shared_counts
+            finally:
+                shm.close()
+                shm.unlink()
+
+    print(f"Disparo de raios concluído em {time.perf_counter() - start:.1f} s.")
+
+    # Magnificação = densidade de raios na fonte / densidade de raios na imagem
+    source_pixel_area = (2 * source_half_size / map_pixels) ** 2
+    magnification = counts * (dx * dx) / source_pixel_area
+    return magnification, counts
+
+
+@instrumented('render')
+def plot_magnification_map(mag_map, source_half_size=SOURCE_HALF_SIZE, kappa_star=KAPPA_STAR, shear=SHEAR):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(8, 8))
+    plt.imshow(np.log10(np.maximum(mag_map, 1e-3)), origin='lower', cmap='afmhot',
+               extent=[-source_half_size, source_half_size, -source_half_size, source_half_size])
+    plt.colorbar(label='log10(Magnificação)')
+    plt.title(f'Mapa de Magnificação (kappa*={kappa_star}, gamma={shear})')
+    plt.xlabel('y1 (raios de Einstein)')
+    plt.ylabel('y2 (raios de Einstein)')
+    plt.show()
+
+
+def run(kappa_star=KAPPA_STAR, shear=SHEAR, smooth_kappa=SMOOTH_KAPPA, source_half_size=SOURCE_HALF_SIZE,
+        map_pixels=MAP_PIXELS, rays_per_side=RAYS_PER_SIDE, num_workers=NUM_WORKERS, output_path=OUTPUT_FILE,
+        seed=42, show=True):
+    """Gera um campo aleatório de lentes, calcula o mapa de magnificação e o grava em `output_path`."""
+    image_half = shooting_region(source_half_size, kappa_star, shear, smooth_kappa)
+    # Lentes em uma região maior que a de raios para evitar efeitos de borda
+    lens_positions, lens_masses = random_point_lenses(kappa_star, 1.5 * image_half, seed=seed)
+    mag_map, ray_counts = magnification_map(lens_positions, lens_masses, source_half_size, map_pixels,
+                                            rays_per_side, image_half, shear, smooth_kappa, num_workers=num_workers)
+    with stage('export', rows=mag_map.size):
+        np.save(output_path, mag_map)
+    print(f"Mapa de magnificação salvo em '{output_path}'.")
+
+    if show:
+        plot_magnification_map(mag_map, source_half_size, kappa_star, shear)
+    return mag_map
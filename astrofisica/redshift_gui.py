@@ -0,0 +1,177 @@
+from . import catalog
+from .instrumentation import instrumented, stage
+
+# --- Parâmetros ---
+NUM_REDSHIFT_BINS = 5
+OUTPUT_HTML_FILE = 'galaxy_positions_3d.html'
+
+
+# --- 1. Dados ---
+def load_redshift_catalog(csv_path=catalog.CSV_FILE):
+    """Catálogo com coordenadas 3D, cores e magnitude absoluta M_r."""
+    df = catalog.load_sdss_catalog(csv_path, required_cols=['ra', 'dec', 'redshift'] + catalog.MAGNITUDE_COLS,
+                                   dropna_cols=['redshift'] + catalog.MAGNITUDE_COLS)
+    catalog.add_cartesian_coords(df)
+    catalog.add_colors(df)
+    df = catalog.add_absolute_magnitude(df)
+    if df.empty:
+        raise ValueError("O DataFrame está vazio após o pré-processamento. Verifique seus dados.")
+    print("Dados carregados e pré-processados com sucesso.")
+    return df
+
+
+def redshift_options(df, num_bins=NUM_REDSHIFT_BINS):
+    """Intervalos de redshift de mesma largura, como textos 'início - fim'."""
+    min_redshift = df['redshift'].min()
+    max_redshift = df['redshift'].max()
+    redshift_range_diff = (max_redshift - min_redshift) / num_bins
+    options = []
+    for i in range(num_bins):
+        start_z = min_redshift + i * redshift_range_diff
+        end_z = min_redshift + (i + 1) * redshift_range_diff
+        if i == num_bins - 1:
+            end_z = max_redshift
+        options.append(f"{start_z:.3f} - {end_z:.3f}")
+    return options
+
+
+def select_redshift_range(df, range_str):
+    start_z_str, end_z_str = range_str.split(' - ')
+    start_z = float(start_z_str)
+    end_z = float(end_z_str)
+    with stage('query', rows=len(df)):
+        return df[(df['redshift'] >= start_z) & (df['redshift'] < end_z)].copy()
+
+
+def summarize(filtered_df, range_str):
+    """Texto com número de galáxias, magnitude, cor e distância médias no intervalo."""
+    num_galaxies = len(filtered_df)
+    if num_galaxies == 0:
+        return (
+            f"Intervalo de Redshift: {range_str}\n"
+            f"Número de Galáxias: 0\n"
+            f"Nenhuma galáxia encontrada neste intervalo."
+        )
+    return (
+        f"Intervalo de Redshift: {range_str}\n"
+        f"Número de Galáxias: {num_galaxies}\n"
+        f"Magnitude 'r' Média: {filtered_df['r'].mean():.2f}\n"
+        f"Cor 'g-r' Média: {filtered_df['g_r_color'].mean():.2f}\n"
+        f"Distância Média: {filtered_df['distance_mpc'].mean():.2f} Mpc"
+    )
+
+
+# --- 2. Gráficos ---
+@instrumented('export')
+def plot_galaxy_positions(filtered_df, range_str, output_html_file=OUTPUT_HTML_FILE):
+    """Salva a distribuição 3D em HTML e retorna o caminho do arquivo."""
+    import plotly.express as px
+
+    fig = px.scatter_3d(filtered_df, x='x', y='y', z='z_cartesian',
+                        color='g_r_color',
+                        color_continuous_scale=px.colors.sequential.Plasma,
+                        size_max=2, opacity=0.7,
+                        title=f'Distribuição 3D de Galáxias (Redshift: {range_str})',
+                        labels={'x': 'X (Mpc)', 'y': 'Y (Mpc)', 'z_cartesian': 'Z (Mpc)', 'g_r_color': 'Cor (g-r)'})
+    fig.update_traces(marker=dict(size=1))
+    fig.write_html(output_html_file)
+    return output_html_file
+
+
+@instrumented('render')
+def plot_redshift_dimension_distribution(filtered_df, range_str):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    plt.scatter(filtered_df['redshift'], filtered_df['r'], s=5, alpha=0.5, c=filtered_df['g_r_color'], cmap='viridis')
+    plt.xlabel('Redshift')
+    plt.ylabel('Magnitude Aparente (r-band)')
+    plt.title(f'Magnitude Aparente vs. Redshift para Galáxias (Redshift: {range_str})')
+    plt.colorbar(label='Cor (g-r)')
+    plt.grid(True)
+    plt.show()
+
+
+@instrumented('render')
+def plot_color_magnitude_diagram(filtered_df, range_str):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    plt.scatter(filtered_df['g_r_color'], filtered_df['M_r'], s=5, alpha=0.5, c=filtered_df['redshift'], cmap='plasma')
+    plt.xlabel('Cor (g-r)')
+    plt.ylabel('Magnitude Absoluta (M_r)')
+    plt.title(f'Diagrama Cor-Magnitude (Redshift: {range_str})')
+    plt.gca().invert_yaxis()
+    plt.colorbar(label='Redshift')
+    plt.grid(True)
+    plt.show()
+
+
+# --- 3. Interface Gráfica ---
+def run(csv_path=catalog.CSV_FILE):
+    """Abre o explorador interativo (Tkinter) de galáxias por faixa de redshift."""
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+
+    try:
+        full_df = load_redshift_catalog(csv_path)
+    except FileNotFoundError:
+        messagebox.showerror("Erro de Arquivo", f"Arquivo '{csv_path}' não encontrado. Certifique-se de que está na mesma pasta do script.")
+        raise
+    except Exception as e:
+        messagebox.showerror("Erro de Processamento", f"Ocorreu um erro ao carregar/processar os dados: {e}")
+        raise
+
+    options = redshift_options(full_df)
+    state = {'filtered_df': full_df.iloc[0:0]}
+
+    root = tk.Tk()
+    root.title("Explorador de Galáxias por Redshift")
+
+    main_frame = ttk.Frame(root, padding="10")
+    main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+    ttk.Label(main_frame, text="Selecione o Intervalo de Redshift:").grid(row=0, column=0, sticky=tk.W, pady=5)
+    current_redshift_range = tk.StringVar(root)
+
+    info_label = ttk.Label(main_frame, text="Selecione um intervalo para ver as informações.", justify=tk.LEFT)
+    info_label.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10)
+
+    def update_info():
+        selected_range_str = current_redshift_range.get()
+        if not selected_range_str:
+            info_label.config(text="Selecione um intervalo de redshift.")
+            return
+        state['filtered_df'] = select_redshift_range(full_df, selected_range_str)
+        info_label.config(text=summarize(state['filtered_df'], selected_range_str))
+
+    def with_selection(plot_function):
+        def callback():
+            update_info()
+            if state['filtered_df'].empty:
+                messagebox.showinfo("Sem Dados", "Nenhuma galáxia encontrada no intervalo de redshift selecionado para plotar.")
+                return
+            plot_function(state['filtered_df'], current_redshift_range.get())
+        return callback
+
+    def save_positions(filtered_df, range_str):
+        output_html_file = plot_galaxy_positions(filtered_df, range_str)
+        messagebox.showinfo("Gráfico Salvo", f"O gráfico 3D foi salvo como '{output_html_file}'. Abra-o em seu navegador.")
+
+    redshift_combobox = ttk.Combobox(main_frame, textvariable=current_redshift_range, values=options, state="readonly")
+    redshift_combobox.grid(row=1, column=0, sticky=(tk.W, tk.E), padx=(0, 10))
+    redshift_combobox.set(options[0])
+    redshift_combobox.bind("<<ComboboxSelected>>", lambda event: update_info())
+
+    button_frame = ttk.Frame(main_frame)
+    button_frame.grid(row=3, column=0, columnspan=2, pady=10)
+
+    ttk.Button(button_frame, text="1. Plotar Gráfico de Posição (3D)",
+               command=with_selection(save_positions)).grid(row=0, column=0, padx=5, pady=5)
+    ttk.Button(button_frame, text="2. Gráfico de Mag. vs. Redshift",
+               command=with_selection(plot_redshift_dimension_distribution)).grid(row=0, column=1, padx=5, pady=5)
+    ttk.Button(button_frame, text="3. Diagrama Cor-Magnitude",
+               command=with_selection(plot_color_magnitude_diagram)).grid(row=0, column=2, padx=5, pady=5)
+
+    update_info()
+    root.mainloop()
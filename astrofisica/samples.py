@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+
+from . import thumbnail_atlas
+from .instrumentation import instrumented, stage
+from .thumbnail_atlas import CLASS_NAMES
+
+# --- Parâmetros ---
+NUM_SAMPLES = 16 # Número de imagens para exibir (pode ajustar)
+
+
+def ensure_atlas(image_dir=thumbnail_atlas.IMAGE_DIR, atlas_path=thumbnail_atlas.ATLAS_FILE,
+                 index_path=thumbnail_atlas.INDEX_FILE, size=thumbnail_atlas.THUMB_SIZE):
+    """Constrói o atlas de miniaturas (apenas uma vez) se ele ainda não existir."""
+    if os.path.exists(atlas_path) and os.path.exists(index_path):
+        return
+    print(f"Atlas '{atlas_path}' não encontrado. Construindo a partir de '{image_dir}' (apenas uma vez)...")
+    thumbnail_atlas.build_atlas(image_dir, atlas_path, index_path, size=size)
+
+
+@instrumented('render')
+def plot_samples(atlas, ids, rows_to_show, labels=None, num_samples=NUM_SAMPLES):
+    import matplotlib.pyplot as plt
+
+    rows = int(np.sqrt(num_samples))
+    cols = int(np.ceil(num_samples / rows))
+
+    fig, axes = plt.subplots(rows, cols, figsize=(12, 12))
+    axes = np.atleast_1d(axes).flatten() # Para facilitar a iteração sobre os subplots
+
+    for i, row in enumerate(rows_to_show):
+        axes[i].imshow(atlas[row])
+        title = str(ids[row]) # O nome do arquivo é o ID da galáxia
+        if labels is not None:
+            title += f" ({CLASS_NAMES[labels[row]]})"
+        axes[i].set_title(title, fontsize=8)
+        axes[i].axis('off') # Desliga os eixos para uma visualização mais limpa
+
+    # Remover quaisquer subplots vazios
+    for j in range(len(rows_to_show), rows * cols):
+        fig.delaxes(axes[j])
+
+    plt.tight_layout() # Ajusta o layout para evitar sobreposição
+    plt.show()
+
+
+def run(image_dir=thumbnail_atlas.IMAGE_DIR, atlas_path=thumbnail_atlas.ATLAS_FILE,
+        index_path=thumbnail_atlas.INDEX_FILE, solutions_path=thumbnail_atlas.SOLUTIONS_FILE,
+        num_samples=NUM_SAMPLES, class_filter=None, seed=None, show=True):
+    """
+    Mostra uma grade de amostras aleatórias (opcionalmente de uma classe:
+    0=Elíptica, 1=Espiral, 2=Irregular) lidas diretamente do atlas.
+    """
+    ensure_atlas(image_dir, atlas_path, index_path)
+    with stage('load') as record:
+        atlas, atlas_ids, atlas_valid = thumbnail_atlas.load_atlas(atlas_path, index_path)
+        record['rows'] = len(atlas_ids)
+    print(f"Atlas carregado: {len(atlas_ids)} miniaturas {atlas.shape[1]}x{atlas.shape[2]}.")
+
+    atlas_labels = None
+    if class_filter is not None:
+        with stage('clean', rows=len(atlas_ids)):
+            atlas_labels = thumbnail_atlas.labels_for_ids(atlas_ids, solutions_path)
+
+    with stage('query', rows=len(atlas_ids)):
+        sample_rows = thumbnail_atlas.sample_indices(atlas_valid, num_samples, atlas_labels, class_filter, seed)
+    if len(sample_rows) == 0:
+        raise ValueError("Nenhuma miniatura disponível para o filtro escolhido.")
+
+    if show:
+        plot_samples(atlas, atlas_ids, sample_rows, atlas_labels, num_samples)
+    print("Visualização de amostras de galáxias concluída.")
+    return atlas_ids[sample_rows]
@@ -0,0 +1,360 @@
+import numpy as np
+
+from . import catalog
+from .instrumentation import instrumented, stage
+
+# --- Parâmetros ---
+# Pixelização hierárquica de áreas iguais no esquema NESTED do HEALPix:
+# 12 * 4**order pixels; cada pixel da ordem k contém 4 filhos na ordem k+1,
+# com IDs consecutivos. Ordem 10 -> nside 1024, pixels de ~3.4 arcmin.
+SKY_ORDER = 10
+MAP_ORDER = 4 # Ordem do mapa de contagens (pixels de ~3.7 graus)
+MAX_ORDER = 29 # Limite para IDs em int64
+
+# Face base de cada um dos 12 pixels de ordem 0: anel (em unidades de nside) e deslocamento em phi
+_JRLL = np.array([2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4], dtype=np.int64)
+_JPLL = np.array([1, 3, 5, 7, 0, 2, 4, 6, 1, 3, 5, 7], dtype=np.int64)
+
+
+# --- 1. Pixelização (HEALPix NESTED) ---
+def _spread_bits(v):
+    """Intercala um zero entre cada bit de um inteiro de 32 bits."""
+    v = v.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return v
+
+
+def _compress_bits(v):
+    """Inverso de _spread_bits: extrai os bits de posição par."""
+    v = v.astype(np.uint64) & np.uint64(0x5555555555555555)
+    v = (v | (v >> np.uint64(1))) & np.uint64(0x3333333333333333)
+    v = (v | (v >> np.uint64(2))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v >> np.uint64(4))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v >> np.uint64(8))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v >> np.uint64(16))) & np.uint64(0x00000000FFFFFFFF)
+    return v.astype(np.int64)
+
+
+def npix(order):
+    return 12 * 4**order
+
+
+def ang2pix(order, ra, dec):
+    """ID NESTED do pixel de ordem `order` que contém cada posição RA/Dec (graus)."""
+    if not 0 <= order <= MAX_ORDER:
+        raise ValueError(f"Ordem de pixelização inválida: {order} (use de 0 a {MAX_ORDER}).")
+    nside = 1 << order
+    ra = np.asarray(ra, dtype=np.float64)
+    dec = np.asarray(dec, dtype=np.float64)
+    z = np.sin(np.deg2rad(dec))
+    za = np.abs(z)
+    tt = np.mod(ra, 360.0) / 90.0 # phi / (pi/2), em [0, 4)
+    tt = np.where(tt >= 4.0, 0.0, tt)
+
+    # Região equatorial (|z| <= 2/3): linhas ascendentes (jp) e descendentes (jm)
+    temp1 = nside * (0.5 + tt)
+    temp2 = nside * 0.75 * z
+    jp = (temp1 - temp2).astype(np.int64)
+    jm = (temp1 + temp2).astype(np.int64)
+    ifp = jp >> order
+    ifm = jm >> order
+    face = np.where(ifp == ifm, ifp | 4, np.where(ifp < ifm, ifp, ifm + 8))
+    ix = jm & (nside - 1)
+    iy = nside - (jp & (nside - 1)) - 1
+
+    # Calotas polares: 1 - |z| calculado sem cancelamento perto dos polos
+    polar = za > 2.0 / 3.0
+    if polar.any():
+        ntt = np.minimum(tt[polar].astype(np.int64), 3)
+        tp = tt[polar] - ntt
+        one_minus_za = 2.0 * np.sin(np.deg2rad(90.0 - np.abs(dec[polar])) / 2.0) ** 2
+        tmp = nside * np.sqrt(3.0 * one_minus_za)
+        jp_polar = np.minimum((tp * tmp).astype(np.int64), nside - 1)
+        jm_polar = np.minimum(((1.0 - tp) * tmp).astype(np.int64), nside - 1)
+        north = z[polar] >= 0
+        face[polar] = np.where(north, ntt, ntt + 8)
+        ix[polar] = np.where(north, nside - jm_polar - 1, jp_polar)
+        iy[polar] = np.where(north, nside - jp_polar - 1, jm_polar)
+
+    return (face << (2 * order)) + (_spread_bits(ix) | (_spread_bits(iy) << np.uint64(1))).astype(np.int64)
+
+
+def pix2ang(order, pix):
+    """RA/Dec (graus) do centro de cada pixel NESTED de ordem `order`."""
+    nside = 1 << order
+    pix = np.asarray(pix, dtype=np.int64)
+    face = pix >> (2 * order)
+    local = pix & ((1 << (2 * order)) - 1)
+    ix = _compress_bits(local)
+    iy = _compress_bits(local >> 1)
+
+    fact2 = 4.0 / npix(order)
+    fact1 = 2 * nside * fact2
+    jr = (_JRLL[face] << order) - ix - iy - 1 # Índice do anel (1 .. 4*nside-1)
+
+    nr = np.where(jr < nside, jr, np.where(jr > 3 * nside, 4 * nside - jr, nside))
+    z = np.where(jr < nside, 1.0 - nr * nr * fact2,
+                 np.where(jr > 3 * nside, nr * nr * fact2 - 1.0, (2 * nside - jr) * fact1))
+
+    tmp = _JPLL[face] * nr + ix - iy
+    tmp = np.where(tmp < 0, tmp + 8 * nr, tmp)
+    phi = np.where(nr == nside, 0.75 * (np.pi / 2) * tmp * fact1, 0.5 * (np.pi / 2) * tmp / np.maximum(nr, 1))
+    return np.rad2deg(phi) % 360.0, np.rad2deg(np.arcsin(np.clip(z, -1.0, 1.0)))
+
+
+def max_pixrad(order):
+    """Maior distância angular (graus) entre o centro de um pixel e qualquer ponto dele."""
+    nside = 1 << order
+    t1 = (1.0 - 1.0 / nside) ** 2
+    va = _unit_vectors(np.rad2deg(np.pi / (4 * nside)), np.rad2deg(np.arcsin(2.0 / 3.0)))
+    vb = _unit_vectors(0.0, np.rad2deg(np.arcsin(1.0 - t1 / 3.0)))
+    return float(_chord_to_deg(np.linalg.norm(va - vb)))
+
+
+def _unit_vectors(ra, dec):
+    ra_rad = np.deg2rad(np.asarray(ra, dtype=np.float64))
+    dec_rad = np.deg2rad(np.asarray(dec, dtype=np.float64))
+    cos_dec = np.cos(dec_rad)
+    return np.stack([cos_dec * np.cos(ra_rad), cos_dec * np.sin(ra_rad), np.sin(dec_rad)], axis=-1)
+
+
+def _chord_to_deg(chord):
+    return np.rad2deg(2.0 * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0)))
+
+
+def add_sky_pixels(df, order=SKY_ORDER):
+    """
+    Adiciona a coluna 'sky_pix' (ID NESTED de ordem `order`) e devolve o
+    catálogo ordenado por ela: cada pixel, em qualquer ordem mais grossa,
+    vira um intervalo contíguo de linhas.
+    """
+    with stage('index_build', rows=len(df)):
+        pix = ang2pix(order, df['ra'].to_numpy(), df['dec'].to_numpy())
+        row_order = np.argsort(pix, kind='stable')
+        df = df.iloc[row_order].reset_index(drop=True)
+        df['sky_pix'] = pix[row_order]
+        df.attrs['sky_order'] = order
+    return df
+
+
+# --- 2. Índice do Catálogo ---
+class SkyIndex:
+    """
+    Catálogo ordenado pelo pixel do céu. Consultas por cone, caixa RA/Dec e
+    footprint percorrem a hierarquia de pixels (ordem 0 -> `order`), mantêm
+    inteiros os pixels totalmente dentro da região e só testam linha a linha
+    as que caem nos pixels da borda. Os índices retornados são posições no
+    catálogo ordenado (`self.df`).
+    """
+
+    def __init__(self, df, order=None):
+        if order is None:
+            order = df.attrs.get('sky_order', SKY_ORDER)
+        if 'sky_pix' not in df.columns or df.attrs.get('sky_order') != order:
+            df = add_sky_pixels(df, order)
+        self.df = df
+        self.order = order
+        self.pix = df['sky_pix'].to_numpy()
+        self.ra = df['ra'].to_numpy(dtype=np.float64)
+        self.dec = df['dec'].to_numpy(dtype=np.float64)
+
+    def __len__(self):
+        return len(self.pix)
+
+    def pixel_rows(self, pixels, order):
+        """Intervalos de linhas [início, fim) ocupados por pixels de ordem `order` (<= self.order)."""
+        shift = 2 * (self.order - order)
+        pixels = np.asarray(pixels, dtype=np.int64)
+        starts = np.searchsorted(self.pix, pixels << shift, side='left')
+        stops = np.searchsorted(self.pix, (pixels + 1) << shift, side='left')
+        return starts, stops
+
+    def _cover(self, classify):
+        """
+        Percorre a hierarquia de pixels. `classify(ra, dec, raio)` recebe os
+        centros dos pixels e o raio máximo deles e devolve duas máscaras:
+        pixels que podem tocar a região e pixels totalmente dentro dela.
+        Retorna (linhas garantidas, linhas a testar).
+        """
+        inside_ranges, edge_ranges = [], []
+        pixels = np.arange(12, dtype=np.int64)
+        for order in range(self.order + 1):
+            starts, stops = self.pixel_rows(pixels, order)
+            occupied = stops > starts # Pixels sem linhas não são refinados
+            pixels, starts, stops = pixels[occupied], starts[occupied], stops[occupied]
+            if len(pixels) == 0:
+                break
+            maybe, inside = classify(*pix2ang(order, pixels), max_pixrad(order))
+            inside &= maybe
+            inside_ranges.append((starts[inside], stops[inside]))
+            edge = maybe & ~inside
+            if order == self.order:
+                edge_ranges.append((starts[edge], stops[edge]))
+            else:
+                pixels = ((pixels[edge] << 2)[:, np.newaxis] + np.arange(4)).ravel()
+        return _ranges_to_rows(inside_ranges), _ranges_to_rows(edge_ranges)
+
+    def cone_rows(self, ra, dec, radius_deg):
+        """Linhas a até `radius_deg` graus de (ra, dec)."""
+        center = _unit_vectors(ra, dec)
+
+        def classify(ra_c, dec_c, pixel_radius):
+            distance = _chord_to_deg(np.linalg.norm(_unit_vectors(ra_c, dec_c) - center, axis=1))
+            return distance <= radius_deg + pixel_radius, distance + pixel_radius <= radius_deg
+
+        with stage('query') as record:
+            inside_rows, edge_rows = self._cover(classify)
+            chord = 2.0 * np.sin(np.deg2rad(radius_deg) / 2.0)
+            near = np.linalg.norm(_unit_vectors(self.ra[edge_rows], self.dec[edge_rows]) - center, axis=1) <= chord
+            rows = np.sort(np.concatenate([inside_rows, edge_rows[near]]))
+            record['rows'] = len(inside_rows) + len(edge_rows)
+        return rows
+
+    def box_rows(self, ra_min, ra_max, dec_min, dec_max):
+        """
+        Linhas com dec_min <= Dec <= dec_max e RA no intervalo de ra_min a
+        ra_max (sentido crescente; ra_min > ra_max atravessa RA = 0).
+        """
+        full_ra = ra_max - ra_min >= 360.0
+        width = (ra_max - ra_min) % 360.0
+
+        def ra_offsets(ra):
+            offset = np.mod(ra - ra_min, 360.0)
+            in_ra = full_ra | (offset <= width)
+            outside = np.minimum(offset - width, 360.0 - offset) # Distância em RA até o intervalo
+            margin = np.minimum(offset, width - offset) # Distância em RA até a borda mais próxima
+            return in_ra, outside, margin
+
+        def classify(ra_c, dec_c, pixel_radius):
+            # Semi-largura em RA de um círculo de raio `pixel_radius` centrado no pixel
+            near_pole = np.abs(dec_c) + pixel_radius >= 90.0
+            cos_dec = np.maximum(np.cos(np.deg2rad(dec_c)), 1e-300)
+            half_width = np.where(near_pole, 180.0, np.rad2deg(np.arcsin(
+                np.minimum(1.0, np.sin(np.deg2rad(pixel_radius)) / cos_dec))))
+            in_ra, outside, margin = ra_offsets(ra_c)
+            maybe = (dec_c >= dec_min - pixel_radius) & (dec_c <= dec_max + pixel_radius) \
+                & (in_ra | (outside <= half_width))
+            inside = (dec_c - pixel_radius >= dec_min) & (dec_c + pixel_radius <= dec_max) \
+                & (full_ra | (in_ra & (margin >= half_width)))
+            return maybe, inside
+
+        with stage('query') as record:
+            inside_rows, edge_rows = self._cover(classify)
+            dec = self.dec[edge_rows]
+            keep = (dec >= dec_min) & (dec <= dec_max) & ra_offsets(self.ra[edge_rows])[0]
+            rows = np.sort(np.concatenate([inside_rows, edge_rows[keep]]))
+            record['rows'] = len(inside_rows) + len(edge_rows)
+        return rows
+
+    def footprint_rows(self, pixels, order):
+        """
+        Linhas dentro de um footprint dado por IDs NESTED de ordem `order`
+        (ou por uma máscara booleana com npix(order) elementos).
+        """
+        pixels = np.asarray(pixels)
+        if pixels.dtype == bool:
+            if len(pixels) != npix(order):
+                raise ValueError(f"Máscara com {len(pixels)} pixels; esperado {npix(order)} para a ordem {order}.")
+            pixels = np.flatnonzero(pixels)
+        pixels = np.unique(pixels.astype(np.int64))
+
+        with stage('query') as record:
+            if order <= self.order:
+                rows = _ranges_to_rows([self.pixel_rows(pixels, order)])
+                record['rows'] = len(rows)
+            else:
+                # Footprint mais fino que o índice: pixels-pais delimitam as linhas, teste exato dentro delas
+                candidates = _ranges_to_rows([self.pixel_rows(np.unique(pixels >> 2 * (order - self.order)),
+                                                              self.order)])
+                fine = ang2pix(order, self.ra[candidates], self.dec[candidates])
+                rows = candidates[np.isin(fine, pixels)]
+                record['rows'] = len(candidates)
+        return rows
+
+    def cone(self, ra, dec, radius_deg):
+        return self.df.iloc[self.cone_rows(ra, dec, radius_deg)]
+
+    def box(self, ra_min, ra_max, dec_min, dec_max):
+        return self.df.iloc[self.box_rows(ra_min, ra_max, dec_min, dec_max)]
+
+    def footprint(self, pixels, order):
+        return self.df.iloc[self.footprint_rows(pixels, order)]
+
+    def pixel_counts(self, order=MAP_ORDER, rows=None):
+        """Mapa de contagens: número de objetos em cada pixel de ordem `order`."""
+        if order <= self.order:
+            pix = self.pix if rows is None else self.pix[rows]
+            return np.bincount(pix >> 2 * (self.order - order), minlength=npix(order))
+        ra = self.ra if rows is None else self.ra[rows]
+        dec = self.dec if rows is None else self.dec[rows]
+        return np.bincount(ang2pix(order, ra, dec), minlength=npix(order))
+
+    def footprint_mask(self, order=MAP_ORDER, min_count=1):
+        """Footprint do levantamento: pixels de ordem `order` com pelo menos `min_count` objetos."""
+        return self.pixel_counts(order) >= min_count
+
+
+def _ranges_to_rows(ranges):
+    """Concatena intervalos [início, fim) de linhas em um único array de posições."""
+    if not ranges:
+        return np.empty(0, dtype=np.int64)
+    starts = np.concatenate([r[0] for r in ranges]).astype(np.int64)
+    stops = np.concatenate([r[1] for r in ranges]).astype(np.int64)
+    lengths = stops - starts
+    # Cada intervalo contribui start, start+1, ...: deslocamento por intervalo + contador global
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return offsets + np.arange(lengths.sum(), dtype=np.int64)
+
+
+# --- 3. Mapa de Contagens ---
+@instrumented('render')
+def plot_pixel_counts(counts, order=MAP_ORDER, title='Objetos por Pixel do Céu'):
+    """Mapa de contagens em projeção Mollweide (RA crescendo para a esquerda)."""
+    import matplotlib.pyplot as plt
+
+    ra, dec = pix2ang(order, np.arange(npix(order)))
+    lon = -np.deg2rad(np.where(ra > 180.0, ra - 360.0, ra))
+    occupied = counts > 0
+
+    plt.figure(figsize=(12, 6))
+    ax = plt.subplot(111, projection='mollweide')
+    points = ax.scatter(lon[occupied], np.deg2rad(dec[occupied]), c=np.log10(counts[occupied]),
+                        s=max(1.0, 2000.0 / 2**order), marker='s', cmap='viridis')
+    plt.colorbar(points, orientation='horizontal', pad=0.05, label='log10(Objetos por pixel)')
+    ax.set_xticklabels([f'{int(t)}°' for t in (150, 120, 90, 60, 30, 0, 330, 300, 270, 240, 210)])
+    ax.grid(True)
+    plt.title(f'{title} (ordem {order}, {npix(order)} pixels)')
+    plt.show()
+
+
+def run(csv_path=catalog.CSV_FILE, order=SKY_ORDER, cone=None, box=None, map_order=MAP_ORDER, show=True):
+    """
+    Carrega o catálogo SDSS com o índice de pixels do céu, executa as
+    consultas pedidas (cone: RA, Dec, raio; caixa: RA mín, RA máx, Dec mín,
+    Dec máx, em graus) e mostra o mapa de contagens do footprint.
+    """
+    df = catalog.load_sdss_catalog(csv_path, required_cols=['ra', 'dec', 'redshift'], sky_order=order)
+    sky_index = SkyIndex(df, order)
+    counts = sky_index.pixel_counts(map_order)
+    print(f"Índice de pixels do céu (ordem {order}): {len(sky_index)} objetos, "
+          f"{np.count_nonzero(counts)} de {npix(map_order)} pixels ocupados na ordem {map_order}.")
+
+    selected = None
+    if cone is not None:
+        selected = sky_index.cone_rows(*cone)
+        print(f"Cone (RA={cone[0]}, Dec={cone[1]}, raio={cone[2]} graus): {len(selected)} objetos.")
+    if box is not None:
+        box_rows = sky_index.box_rows(*box)
+        print(f"Caixa RA [{box[0]}, {box[1]}], Dec [{box[2]}, {box[3]}]: {len(box_rows)} objetos.")
+        selected = box_rows if selected is None else np.intersect1d(selected, box_rows)
+
+    if show:
+        if selected is not None:
+            plot_pixel_counts(sky_index.pixel_counts(map_order, selected), map_order, 'Objetos Selecionados por Pixel')
+        else:
+            plot_pixel_counts(counts, map_order)
+    return sky_index if selected is None else sky_index.df.iloc[selected]
@@ -0,0 +1,167 @@
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from .instrumentation import stage
+
+# --- Parâmetros ---
+IMAGE_DIR = 'images' # Pasta com as imagens .jpg do Galaxy Zoo
+SOLUTIONS_FILE = 'training_solutions.csv' # Rótulos do Galaxy Zoo (opcional, para filtrar por classe)
+ATLAS_FILE = 'thumbnail_atlas.npy' # Miniaturas empacotadas (N, THUMB_SIZE, THUMB_SIZE, 3) uint8
+INDEX_FILE = 'thumbnail_atlas_index.npz' # IDs das galáxias e máscara de miniaturas válidas
+THUMB_SIZE = 64 # Tamanho das miniaturas (pixels x pixels)
+CHUNK_SIZE = 512 # Imagens decodificadas por tarefa
+NUM_WORKERS = os.cpu_count() or 1
+
+CLASS_NAMES = {0: 'Elíptica', 1: 'Espiral', 2: 'Irregular'}
+
+
+# --- 1. Listagem das Imagens ---
+def list_image_ids(image_dir=IMAGE_DIR):
+    """IDs (inteiros) das imagens <GalaxyID>.jpg na pasta, em ordem crescente."""
+    ids = []
+    with os.scandir(image_dir) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext.lower() == '.jpg' and stem.isdigit():
+                ids.append(int(stem))
+    return np.sort(np.array(ids, dtype=np.int64))
+
+
+def load_thumbnail(path, size=THUMB_SIZE):
+    """Decodifica uma imagem já reduzida (draft do JPEG) e redimensiona para size x size."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img.draft('RGB', (size, size)) # Decodificação JPEG em escala reduzida (muito mais rápida)
+        return np.asarray(img.convert('RGB').resize((size, size)), dtype=np.uint8)
+
+
+# --- 2. Construção do Atlas (Decodificação Paralela) ---
+_worker_state = {}
+
+
+def _init_worker(atlas_path, image_dir, size):
+    _worker_state['atlas'] = np.load(atlas_path, mmap_mode='r+')
+    _worker_state['image_dir'] = image_dir
+    _worker_state['size'] = size
+
+
+def _decode_chunk(task):
+    start, ids = task
+    atlas = _worker_state['atlas']
+    valid = np.ones(len(ids), dtype=bool)
+    for offset, galaxy_id in enumerate(ids):
+        path = os.path.join(_worker_state['image_dir'], f"{galaxy_id}.jpg")
+        try:
+            atlas[start + offset] = load_thumbnail(path, _worker_state['size'])
+        except Exception as e:
+            print(f"Erro ao abrir imagem {path}: {e}")
+            atlas[start + offset] = 0
+            valid[offset] = False
+    atlas.flush()
+    return start, valid
+
+
+def build_atlas(image_dir=IMAGE_DIR, atlas_path=ATLAS_FILE, index_path=INDEX_FILE, size=THUMB_SIZE,
+                chunk_size=CHUNK_SIZE, num_workers=NUM_WORKERS):
+    """
+    Decodifica todas as imagens da pasta uma única vez, em paralelo, para um
+    array uint8 empacotado (N, size, size, 3) gravado em `atlas_path`, e
+    grava o índice de IDs em `index_path`. Retorna o número de miniaturas.
+    """
+    start_time = time.perf_counter()
+    if not os.path.isdir(image_dir):
+        raise FileNotFoundError(f"O diretório de imagens '{image_dir}' não foi encontrado.")
+    with stage('load') as record:
+        ids = list_image_ids(image_dir)
+        record['rows'] = len(ids)
+    if len(ids) == 0:
+        raise FileNotFoundError(f"Nenhuma imagem .jpg encontrada na pasta '{image_dir}'.")
+
+    atlas = np.lib.format.open_memmap(atlas_path, mode='w+', dtype=np.uint8, shape=(len(ids), size, size, 3))
+    del atlas
+
+    tasks = [(start, ids[start:start + chunk_size]) for start in range(0, len(ids), chunk_size)]
+    valid = np.ones(len(ids), dtype=bool)
+    num_workers = max(1, min(num_workers, len(tasks)))
+
+    def collect(results):
+        done = 0
+        for start, chunk_valid in results:
+            valid[start:start + len(chunk_valid)] = chunk_valid
+            done += len(chunk_valid)
+            print(f"Carregadas {done} imagens...")
+
+    with stage('transform', rows=len(ids), workers=num_workers):
+        if num_workers == 1:
+            _init_worker(atlas_path, image_dir, size)
+            try:
+                collect(map(_decode_chunk, tasks))
+            finally:
+                _worker_state.clear() # Fecha o memmap mesmo em caso de erro
+        else:
+            # O bloco `with` encerra os processos mesmo se um deles falhar (ou com Ctrl-C)
+            with Pool(num_workers, initializer=_init_worker, initargs=(atlas_path, image_dir, size)) as pool:
+                collect(pool.imap_unordered(_decode_chunk, tasks))
+
+    with stage('export', rows=len(ids)):
+        np.savez(index_path, ids=ids, valid=valid, size=np.int64(size))
+    print(f"Atlas com {len(ids)} miniaturas {size}x{size} gravado em '{atlas_path}' "
+          f"({time.perf_counter() - start_time:.1f} s).")
+    return len(ids)
+
+
+# --- 3. Leitura e Amostragem ---
+def load_atlas(atlas_path=ATLAS_FILE, index_path=INDEX_FILE):
+    """Atlas mapeado em memória (sem ler as miniaturas) e (ids, valid) das miniaturas."""
+    atlas = np.load(atlas_path, mmap_mode='r')
+    with np.load(index_path) as index:
+        ids = index['ids']
+        valid = index['valid']
+    return atlas, ids, valid
+
+
+def simplified_labels(solutions_df):
+    """
+    Rótulo simplificado por galáxia (0=Elíptica, 1=Espiral, 2=Irregular,
+    -1=nenhuma), com as mesmas regras de galaxy_classifier_cnn.py.
+    """
+    labels = np.full(len(solutions_df), -1, dtype=np.int64)
+    labels[(solutions_df['Class7.1'] >= 0.5).to_numpy()] = 2
+    labels[(solutions_df['Class2.1'] >= 0.5).to_numpy()] = 1
+    labels[(solutions_df['Class1.1'] >= 0.5).to_numpy()] = 0 # Regra com maior prioridade aplicada por último
+    return labels
+
+
+def labels_for_ids(ids, solutions_path=SOLUTIONS_FILE):
+    """Rótulos simplificados alinhados aos IDs do atlas (-1 para IDs sem solução)."""
+    import pandas as pd
+
+    solutions_df = pd.read_csv(solutions_path, usecols=['GalaxyID', 'Class1.1', 'Class2.1', 'Class7.1'])
+    solution_ids = solutions_df['GalaxyID'].to_numpy(dtype=np.int64)
+    solution_labels = simplified_labels(solutions_df)
+
+    order = np.argsort(solution_ids)
+    solution_ids = solution_ids[order]
+    solution_labels = solution_labels[order]
+    pos = np.clip(np.searchsorted(solution_ids, ids), 0, max(len(solution_ids) - 1, 0))
+    labels = np.full(len(ids), -1, dtype=np.int64)
+    if len(solution_ids):
+        found = solution_ids[pos] == ids
+        labels[found] = solution_labels[pos[found]]
+    return labels
+
+
+def sample_indices(valid, num_samples, labels=None, label=None, seed=None):
+    """Índices (linhas do atlas) aleatórios, opcionalmente filtrados por rótulo."""
+    mask = valid.copy()
+    if label is not None:
+        mask &= labels == label
+    candidates = np.flatnonzero(mask)
+    rng = np.random.default_rng(seed)
+    if len(candidates) <= num_samples:
+        return candidates
+    return np.sort(rng.choice(candidates, num_samples, replace=False))